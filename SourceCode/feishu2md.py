@@ -25,6 +25,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
 import threading
+import multiprocessing
 import subprocess
 import platform
 
@@ -184,11 +185,6 @@ def check_dependencies():
     missing_deps = []
 
     # 检查Python包
-    try:
-        import tqdm
-    except ImportError:
-        missing_deps.append('tqdm')
-
     try:
         import docx
     except ImportError:
@@ -1142,4 +1138,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为 exe 后，清理步骤使用的进程池需要此调用才能正常启动子进程
+    multiprocessing.freeze_support()
     main()
@@ -3,7 +3,7 @@
 依赖检测与安装工具 (install_dependencies.py)
 
 本脚本用于检测并安装项目所需的所有依赖项，包括：
-1. Python 依赖包 (tqdm, python-docx)
+1. Python 依赖包 (python-docx)
 2. 外部程序 Pandoc
 
 用法:
@@ -38,6 +38,7 @@ class DependencyChecker:
         self.missing_packages = []
         self.installed_packages = []
         self.pandoc_installed = False
+        self._http_pool = None  # 延迟创建的 urllib3 连接池
 
     def print_header(self, text):
         """打印标题。"""
@@ -73,7 +74,6 @@ class DependencyChecker:
 
         # 定义需要检查的包
         packages = {
-            'tqdm': 'tqdm',
             'python-docx': 'docx'  # python-docx的导入名是docx
         }
 
@@ -246,9 +246,44 @@ class DependencyChecker:
         print("─" * 70)
         return False
 
+    def _download_file(self, url, dest_path):
+        """
+        下载文件到指定路径。
+
+        如果安装了 urllib3，则复用同一个连接池（多次重试时可复用已建立的
+        TCP/TLS 连接）；否则回退到标准库 urllib 以流式方式下载。
+
+        Args:
+            url: 下载地址
+            dest_path: 保存路径
+        """
+        try:
+            import urllib3
+        except ImportError:
+            urllib3 = None
+
+        if urllib3 is not None:
+            if self._http_pool is None:
+                self._http_pool = urllib3.PoolManager(num_pools=4, maxsize=8)
+            response = self._http_pool.request('GET', url,
+                                               preload_content=False,
+                                               timeout=60.0)
+            try:
+                if response.status != 200:
+                    raise IOError(f"HTTP {response.status}")
+                with open(dest_path, 'wb') as f:
+                    shutil.copyfileobj(response, f, 1 << 20)
+            finally:
+                response.release_conn()
+            return
+
+        import urllib.request
+        with urllib.request.urlopen(url, timeout=60) as response, \
+                open(dest_path, 'wb') as f:
+            shutil.copyfileobj(response, f, 1 << 20)
+
     def download_and_install_pandoc_macos(self):
         """在macOS上下载并安装Pandoc。"""
-        import urllib.request
         import tempfile
 
         print("正在下载 Pandoc for macOS...")
@@ -279,7 +314,7 @@ class DependencyChecker:
                         print("尝试官方源...")
 
                     print(f"下载地址: {download_url}")
-                    urllib.request.urlretrieve(download_url, installer_path)
+                    self._download_file(download_url, installer_path)
                     print("✓ 下载完成")
 
                     print("正在安装 Pandoc（需要管理员权限）...")
@@ -10,32 +10,36 @@ Markdown 处理工具 - 命令行版本 (main.py)
 5. 文件分块 (markdown_split.py)
 
 用法:
-    python main.py <输入文件.docx> [输出目录]
+    python main.py <输入文件.docx> [输出目录] [--auto] [--skip 4,5]
+
+    --auto (或 --non-interactive) 跳过所有交互式询问，步骤 3 和 4 采用默认选项；
+    当标准输入不是终端 (例如在 CI 或脚本中运行) 时会自动启用。
 
 示例:
     python main.py document.docx output
     python main.py "E:\TestProgram\周报上位机\飞镖上位机周报.docx" "E:\TestProgram\output"
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import shutil
 from pathlib import Path
+from typing import List, Set
 
 
-def check_and_install_dependencies():
-    """检测并安装缺失的依赖。"""
-    missing_deps = []
+def check_and_install_dependencies(auto: bool = False):
+    """
+    检测并安装缺失的依赖。
 
-    # 检查Python包
-    try:
-        import tqdm
-    except ImportError:
-        missing_deps.append('tqdm')
+    Args:
+        auto: 非交互模式，发现缺失依赖时不询问，直接提示后退出。
+    """
+    missing_deps = []
 
-    try:
-        import docx
-    except ImportError:
+    # 检查Python包（仅查找模块，不实际导入，避免加载 lxml 等重量级依赖）
+    if importlib.util.find_spec('docx') is None:
         missing_deps.append('python-docx')
 
     # 检查Pandoc
@@ -60,6 +64,10 @@ def check_and_install_dependencies():
         if pandoc_missing:
             print("  访问 https://pandoc.org/installing.html")
 
+        if auto:
+            print("\n非交互模式下不会自动安装，请先安装依赖后重新运行此脚本。")
+            sys.exit(1)
+
         choice = input("\n是否现在自动安装? (y/n): ").lower().strip()
 
         if choice == 'y':
@@ -84,29 +92,33 @@ def check_and_install_dependencies():
             sys.exit(1)
 
 
-# 首先检查依赖
-check_and_install_dependencies()
-
-# 导入各个处理模块
-from docx_to_markdown import PandocConverter
-from markdown_cleaner import MarkdownCleaner
-from markdown_repair import CodeBlockProcessor
-from markdown_setting import BoldHeaderCorrector
-from markdown_split import MarkdownSplitter
-
-
 class MarkdownProcessor:
     """Markdown 处理器主类，负责协调所有处理步骤。"""
 
-    def __init__(self, docx_path: str, output_dir: str = None):
+    # 已创建过的输出目录，批量处理时避免重复的 makedirs/stat 调用
+    _created_dirs: Set[str] = set()
+
+    @classmethod
+    def _ensure_dir(cls, path: str) -> None:
+        """确保目录存在，同一目录在进程内只创建一次。"""
+        path = os.path.abspath(path)
+        if path in cls._created_dirs:
+            return
+        os.makedirs(path, exist_ok=True)
+        cls._created_dirs.add(path)
+
+    def __init__(self, docx_path: str, output_dir: str = None,
+                 auto: bool = False):
         """
         初始化处理器。
 
         Args:
             docx_path: 输入的 Word 文件路径
             output_dir: 输出目录路径，默认为输入文件所在目录下的output文件夹
+            auto: 非交互模式，步骤 3 和 4 不再询问用户而是采用默认选项
         """
         self.docx_path = docx_path
+        self.auto = auto
 
         # 如果未指定输出目录，使用输入文件所在目录下的output文件夹
         if output_dir is None:
@@ -118,7 +130,7 @@ class MarkdownProcessor:
         self.base_name = Path(docx_path).stem
 
         # 创建输出目录
-        os.makedirs(self.output_dir, exist_ok=True)
+        self._ensure_dir(self.output_dir)
 
         # 定义中间文件路径
         self.step1_output = os.path.join(self.output_dir, f"{self.base_name}.md")
@@ -137,6 +149,7 @@ class MarkdownProcessor:
         """步骤 1: 将 Word 文档转换为 Markdown。"""
         self.print_step(1, 5, "Word 转 Markdown")
         try:
+            from docx_to_markdown import PandocConverter
             converter = PandocConverter(self.docx_path, self.output_dir)
             md_path = converter.convert()
             print(f"✓ 成功生成: {md_path}")
@@ -149,6 +162,7 @@ class MarkdownProcessor:
         """步骤 2: 清理 Markdown 中的 HTML 格式。"""
         self.print_step(2, 5, "清理 HTML 格式")
         try:
+            from markdown_cleaner import MarkdownCleaner
             cleaner = MarkdownCleaner(self.step1_output, self.step2_output)
             cleaner.clean()
             print(f"✓ 成功生成: {self.step2_output}")
@@ -161,13 +175,17 @@ class MarkdownProcessor:
         """步骤 3: 修正代码块格式（交互式）。"""
         self.print_step(3, 5, "修正代码块格式")
         try:
-            print("注意: 此步骤需要交互式输入。")
+            from markdown_repair import CodeBlockProcessor
+            if self.auto:
+                print("非交互模式: 所有代码块将采用默认选项处理。")
+            else:
+                print("注意: 此步骤需要交互式输入。")
             print("-" * 70)
 
             with open(self.step2_output, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            processor = CodeBlockProcessor()
+            processor = CodeBlockProcessor(auto=self.auto)
             corrected_content = processor.run(content)
 
             with open(self.step3_output, 'w', encoding='utf-8') as f:
@@ -183,10 +201,14 @@ class MarkdownProcessor:
         """步骤 4: 修正标题格式（交互式）。"""
         self.print_step(4, 5, "修正标题格式")
         try:
-            print("注意: 此步骤需要交互式输入。")
+            from markdown_setting import BoldHeaderCorrector
+            if self.auto:
+                print("非交互模式: 加粗标题将保留原样。")
+            else:
+                print("注意: 此步骤需要交互式输入。")
             print("-" * 70)
 
-            corrector = BoldHeaderCorrector(self.step3_output)
+            corrector = BoldHeaderCorrector(self.step3_output, auto=self.auto)
             corrector.correct()
 
             print(f"✓ 成功生成: {self.step4_output}")
@@ -199,6 +221,7 @@ class MarkdownProcessor:
         """步骤 5: 按标题拆分文件。"""
         self.print_step(5, 5, "按标题拆分文件")
         try:
+            from markdown_split import MarkdownSplitter
             splitter = MarkdownSplitter(self.step4_output, self.step5_output_dir)
             splitter.split(split_by="##", show_progress=True)
             print(f"✓ 成功生成拆分文件到: {self.step5_output_dir}")
@@ -254,20 +277,43 @@ class MarkdownProcessor:
         return True
 
 
+def parse_skip_steps(skip_input: str) -> List[int]:
+    """将 "4,5" 形式的字符串解析为步骤编号列表，格式错误时返回空列表。"""
+    if not skip_input:
+        return []
+    try:
+        return [int(s.strip()) for s in skip_input.split(',')]
+    except ValueError:
+        print("输入格式错误，将执行所有步骤。")
+        return []
+
+
 def main():
     """主函数，处理命令行参数。"""
-    # 检查命令行参数
-    if len(sys.argv) < 2:
-        print("错误: 缺少必要参数！\n")
-        print("用法: python main.py <输入文件.docx> [输出目录]")
-        print("\n示例:")
-        print('  python main.py document.docx')
-        print('  python main.py document.docx output')
-        print('  python main.py "E:\\TestProgram\\周报上位机\\飞镖上位机周报.docx" "E:\\TestProgram\\output"')
-        sys.exit(1)
-
-    docx_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else 'output'
+    parser = argparse.ArgumentParser(
+        description="Markdown 处理工具 - 一键执行 Word 转 Markdown 的全部五个步骤。",
+        epilog=('示例:\n'
+                '  python main.py document.docx\n'
+                '  python main.py document.docx output\n'
+                '  python main.py document.docx output --auto --skip 5'),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("docx_file", help="输入的 Word (.docx) 文件路径。")
+    parser.add_argument("output_dir", nargs='?', default='output',
+                        help="输出目录路径，默认为 output。")
+    parser.add_argument("--auto", "--non-interactive", dest="auto",
+                        action="store_true",
+                        help="非交互模式：不询问任何问题，步骤 3 和 4 全部采用默认选项。"
+                             "标准输入不是终端时自动启用。")
+    parser.add_argument("--skip", default=None,
+                        help="要跳过的步骤 (用逗号分隔，如: 4,5)。")
+    args = parser.parse_args()
+
+    docx_file = args.docx_file
+    output_dir = args.output_dir
+    auto = args.auto or not sys.stdin.isatty()
+
+    # 首先检查依赖 (各个处理模块在对应步骤中按需导入)
+    check_and_install_dependencies(auto=auto)
 
     # 检查输入文件是否存在
     if not os.path.exists(docx_file):
@@ -277,30 +323,29 @@ def main():
     # 检查文件扩展名
     if not docx_file.lower().endswith('.docx'):
         print("警告: 输入文件不是 .docx 格式，可能无法正确处理。")
-        choice = input("是否继续? (y/n): ").lower()
-        if choice != 'y':
-            print("已取消。")
-            sys.exit(0)
+        if not auto:
+            choice = input("是否继续? (y/n): ").lower()
+            if choice != 'y':
+                print("已取消。")
+                sys.exit(0)
 
-    # 询问是否跳过某些步骤
-    print("\n您可以选择跳过某些步骤（通常建议执行所有步骤）:")
-    print("  步骤 1: Word 转 Markdown")
-    print("  步骤 2: 清理 HTML 格式")
-    print("  步骤 3: 修正代码块 (需要交互)")
-    print("  步骤 4: 修正标题 (需要交互)")
-    print("  步骤 5: 文件拆分")
-
-    skip_input = input("\n要跳过的步骤 (用逗号分隔，如: 4,5)，直接回车执行所有步骤: ").strip()
-    skip_steps = []
-    if skip_input:
-        try:
-            skip_steps = [int(s.strip()) for s in skip_input.split(',')]
-        except ValueError:
-            print("输入格式错误，将执行所有步骤。")
+    if args.skip is not None or auto:
+        skip_steps = parse_skip_steps((args.skip or '').strip())
+    else:
+        # 询问是否跳过某些步骤
+        print("\n您可以选择跳过某些步骤（通常建议执行所有步骤）:")
+        print("  步骤 1: Word 转 Markdown")
+        print("  步骤 2: 清理 HTML 格式")
+        print("  步骤 3: 修正代码块 (需要交互)")
+        print("  步骤 4: 修正标题 (需要交互)")
+        print("  步骤 5: 文件拆分")
+
+        skip_input = input("\n要跳过的步骤 (用逗号分隔，如: 4,5)，直接回车执行所有步骤: ").strip()
+        skip_steps = parse_skip_steps(skip_input)
 
     # 创建处理器并执行
     try:
-        processor = MarkdownProcessor(docx_file, output_dir)
+        processor = MarkdownProcessor(docx_file, output_dir, auto=auto)
         success = processor.process_all(skip_steps=skip_steps)
 
         if success:
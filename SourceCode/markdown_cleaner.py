@@ -32,9 +32,38 @@ Markdown 清理与修复工具 (markdown_cleaner.py)
 """
 
 import argparse
+import os
 import re
 import sys
-from typing import Match
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Match
+
+# 可选依赖 google-re2：线性时间的正则引擎，可避免 `.*?` 在大文本上的回溯退化
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+def _compile_linear(pattern: str, flags: int = 0):
+    """
+    优先使用 RE2 编译正则表达式，未安装或模式不受支持时回退到标准库 re。
+
+    仅用于不含 \\s、\\w 等预定义字符类的模式：RE2 中这些字符类
+    只匹配 ASCII，与 re 的 Unicode 语义不同。
+    """
+    if re2 is not None:
+        inline_flags = ''.join(
+            letter for flag, letter in ((re.IGNORECASE, 'i'),
+                                        (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+            if flags & flag)
+        try:
+            return re2.compile(
+                f'(?{inline_flags}){pattern}' if inline_flags else pattern)
+        except Exception:
+            pass
+    return re.compile(pattern, flags=flags)
 
 
 class MarkdownCleaner:
@@ -62,6 +91,12 @@ class MarkdownCleaner:
     _DASHED_BLOCK_PATTERN = re.compile(r'^\s*-{3,}\s*\n(.*?)\n^\s*-{3,}\s*$',
                                        flags=re.MULTILINE | re.DOTALL)
 
+    # `---` 块首行的语言名称
+    _LANG_NAME_PATTERN = re.compile(r'([a-zA-Z0-9+#.-]+)')
+
+    # 匹配行首被 Pandoc 转义的星号 `\*`
+    _ESCAPED_STAR_PATTERN = re.compile(r'^\s*\\\*', flags=re.MULTILINE)
+
     # 匹配并修复带有 Pandoc 属性和绝对路径的图片链接
     _IMAGE_LINK_PATTERN = re.compile(
         r'(!\[.*?\]\().*?(media[\\/]media[\\/][^)]+)\)\s*\{.*?\}',
@@ -72,7 +107,8 @@ class MarkdownCleaner:
                                  flags=re.IGNORECASE | re.DOTALL)
 
     # 匹配标准代码块，用于内部内容的清理和格式化
-    _CODE_BLOCK_PATTERN = re.compile(r'```(.*?)\n(.*?)\n```', flags=re.DOTALL)
+    _CODE_BLOCK_PATTERN = _compile_linear(r'```(.*?)\n(.*?)\n```',
+                                          flags=re.DOTALL)
 
     # (已重写) 匹配多种由于 Pandoc 错误转换产生的 C 语言注释格式
     _start = r'(?:\*\s*/\*|\*/\s*\*)'
@@ -85,6 +121,106 @@ class MarkdownCleaner:
     _SINGLE_LINE_COMMENT_EMPHASIS_PATTERN = re.compile(r'^\s*\*(//.*)\*\s*$',
                                                        flags=re.MULTILINE)
 
+    # 飞书文本表格：边框行 (由 - 和空白组成) 与列分隔 (3个以上连续空白)
+    _TEXT_TABLE_BORDER_PATTERN = re.compile(r'^[-\s]+[-]+[-\s]*$')
+    _TEXT_TABLE_START_PATTERN = re.compile(
+        r'^(?=.{11})(?=(?:[^-]*-){5})[-\s]+[-]+[-\s]*$')
+    _TEXT_TABLE_COLUMN_PATTERN = re.compile(r'\s{3,}')
+    # 整行只由短横线和 (非换行) 空白组成，且首个非空白字符是短横线
+    _TEXT_TABLE_LINE_PATTERN = re.compile(r'^[^\S\n]*-(?:-|[^\S\n])*$',
+                                          flags=re.MULTILINE)
+
+    # 表格行判断 (单次扫描)，依次对应：
+    # 1. 标准 Markdown 表格行：以 | 开头或结尾，或包含至少两个 |
+    # 2. 飞书文本表格边框：至少11个字符，由 - 和空白组成且至少5个短横线
+    # 3. 飞书文本表格数据行：包含3个以上连续空白，且不是标题或引用
+    _TABLE_LINE_PATTERN = re.compile(
+        r'\s*\||[^|]*\|(?:.*\||\s*$)'
+        r'|\s*(?=(?:\s*-){5})-[-\s]{9,}-\s*$'
+        r'|(?!\s*[#>]).*\s{3,}')
+    # 仅由短横线组成的代码块边框
+    _DASH_RUN_PATTERN = re.compile(r'^-{3,}$')
+
+    # 常见编程语言列表，用于识别 `---` 代码块边框后的语言名称
+    _CODE_LANGS = frozenset({
+        'c', 'cpp', 'c++', 'java', 'python', 'javascript', 'js', 'typescript',
+        'ts', 'go', 'rust', 'ruby', 'php', 'swift', 'kotlin', 'scala', 'perl',
+        'shell', 'bash', 'sh', 'sql', 'html', 'css', 'xml', 'json', 'yaml',
+        'markdown', 'md', 'text', 'txt', 'cs', 'c#', 'vb', 'matlab', 'r', 'lua'
+    })
+    # 代码缩进：触发减少/增加缩进的行首与行尾，以及按层级缓存的缩进字符串
+    _DEDENT_PREFIXES = ('}', 'case ', 'default:')
+    _INDENT_SUFFIXES = ('{', ':')
+    _INDENTS = ['']
+
+    # 需要自动缩进和间距格式化的 C 家族语言
+    _C_FAMILY_LANGS = frozenset(
+        {'c', 'cpp', 'c++', 'java', 'javascript', 'js', 'c#', 'cs'})
+
+    # 各清理步骤所需的标志子串：反斜杠、代码块、图片、HTML 标签与实体、
+    # `---` 块以及需要合并的多余空行
+    _ARTIFACT_MARKERS = ('\\', '```', '![', '<', '&', '---', '\n\n\n')
+
+    # 代码块总字符数超过该值 (且多于一个代码块) 时并行清理。
+    # 顺序清理约 5-6 MB/s，而 Windows/macOS 以 spawn 方式启动进程池
+    # (包括打包后的 exe) 需要约 1 秒，只有非常大的文档才值得启动进程池
+    _PARALLEL_MIN_CHARS = 8 * 1024 * 1024
+
+    # 流式清理时单个块的最小字符数
+    _CHUNK_SIZE = 1 << 18
+    # <td> 开始与结束标签，用于判断分块位置是否在单元格内部
+    _TD_BOUNDARY_PATTERN = re.compile(r'<td[^>]*>?|</td>', flags=re.IGNORECASE)
+    # 行末未闭合的表格标签：_HTML_LEFTOVER_PATTERN 的 [^>]* 会越过换行
+    _OPEN_TABLE_TAG_PATTERN = re.compile(
+        r'</?(?:td|tr|tbody|table|colgroup|col)[^>]*\Z', flags=re.IGNORECASE)
+
+    # 通用 HTML 清理分两遍进行：先处理 <br> 与 <em>/<strong>，
+    # 再解码 &amp; 并移除残留的表格标签。表格标签的 [^>]* 可以越过其后的
+    # <br> 等标签，必须在第一遍替换完成后再匹配，否则会误删其间的文本
+    _HTML_INLINE_PATTERN = re.compile(r'<br\s*/?>|</?(?:em|strong)>',
+                                      flags=re.IGNORECASE)
+    _HTML_LEFTOVER_PATTERN = re.compile(
+        r'&amp;|</?(?:td|tr|tbody|table|colgroup|col)[^>]*>',
+        flags=re.IGNORECASE)
+    # 三个及以上的连续换行
+    _EXCESS_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+
+    # 匹配包含反斜杠的整行，用于在非表格行中移除多余的转义反斜杠
+    _BACKSLASH_LINE_PATTERN = re.compile(r'^.*\\.*$', flags=re.MULTILINE)
+
+    # 代码块内部清理使用的正则表达式
+    _TRAILING_BACKSLASH_PATTERN = re.compile(r'\\\s*$', flags=re.MULTILINE)
+    _BOLD_PATTERN = _compile_linear(r'\*\*(.*?)\*\*', flags=re.DOTALL)
+    # 内容不含中文字符的错误斜体 (中文范围以字面字符给出，兼容 RE2)
+    _NON_CJK_ITALIC_PATTERN = _compile_linear(
+        r'\*([^' '\u4e00-\u9fa5' r'*]+)\*')
+    # 匹配 C 风格的注释 (块注释和行注释)
+    _C_COMMENT_PATTERN = _compile_linear(r'/\*.*?\*/|//.*', flags=re.DOTALL)
+    # 注释的占位符及其还原模式：占位符不含星号和中文字符，
+    # 对斜体清理的影响与原来的 __COMMENT_PLACEHOLDER_n__ 相同
+    _COMMENT_PLACEHOLDER_PATTERN = re.compile(r'\x00([0-9]+)\x00')
+
+    # 代码行格式化所需的操作符，按长度降序排列，保证复合操作符优先匹配
+    _OPERATORS = sorted([
+        '==', '!=', '<=', '>=', '&&', '||', '+=', '-=', '*=', '/=', '%=', '&=',
+        '|=', '^=', '<<=', '>>=', '=', '>', '<', '+', '-', '/', '%', '&', '|',
+        '^', '?', ':'
+    ], key=len, reverse=True)
+
+    # 代码行格式化使用的正则表达式（一次编译，逐行复用）
+    # 单次扫描依次识别：字符串字面量 (原样保留)、`->` (原样保留)、操作符、
+    # 逗号/分号以及后接括号的控制关键字。单独的 `-` 不能是 `->` 的一部分
+    _LINE_TOKEN_PATTERN = re.compile(
+        r'(?P<string>"[^"]*")'
+        r'|(?P<arrow>->)'
+        r'|\s*(?P<operator>' + '|'.join('-(?!>)' if op == '-' else re.escape(op)
+                                       for op in _OPERATORS) + r')\s*'
+        r'|\s*(?P<punct>[,;])\s*'
+        r'|\b(?P<keyword>if|for|while|switch)\s*\(')
+    _MULTISPACE_PATTERN = re.compile(r'\s{2,}')
+    # 可能触发上述记号的全部字符 (关键字只有后接 `(` 时才需要处理)
+    _LINE_TOKEN_CHARS = frozenset('"-=!<>&|+*/%^?:,;(')
+
     # ==========================================================================
     # 私有静态辅助方法 (Callbacks & Helpers)
     # ==========================================================================
@@ -95,52 +231,67 @@ class MarkdownCleaner:
         content = match.group(2).strip()
         return f'/* {content} */'
 
+    @staticmethod
+    def _space_line_token(match: Match) -> str:
+        """
+        回调：为单个代码记号生成规范间距。
+
+        逗号、分号会吞掉紧邻其前的空白，因此其前的操作符 (以及分号前的
+        逗号) 不再补充尾随空格。
+        """
+        kind = match.lastgroup
+        if kind == 'keyword':
+            return match.group('keyword') + ' ('
+        if kind == 'string' or kind == 'arrow':
+            return match.group(0)
+        token = match.group(kind)
+        following = match.string[match.end():match.end() + 1]
+        if kind == 'operator':
+            if following == ',' or following == ';':
+                return ' ' + token
+            return ' ' + token + ' '
+        if token == ',' and following == ';':
+            return token
+        return token + ' '
+
     @staticmethod
     def _format_line_spacing(line: str) -> str:
         """为代码行内的操作符和符号添加规范的空格，会忽略字符串字面量内容。"""
-        parts = re.split(r'(".*?")', line)
-        formatted_parts = []
-        for i, part in enumerate(parts):
-            if i % 2 == 1:
-                formatted_parts.append(part)
-                continue
-            formatted_part = part
-            formatted_part = formatted_part.replace('->', 'TEMP_ARROW')
-            operators = [
-                '==', '!=', '<=', '>=', '&&', '||', '+=', '-=', '*=', '/=',
-                '%=', '&=', '|=', '^=', '<<=', '>>=', '=', '>', '<', '+', '-',
-                '/', '%', '&', '|', '^', '?', ':'
-            ]
-            for op in operators:
-                formatted_part = re.sub(r'\s*' + re.escape(op) + r'\s*',
-                                        f' {op} ', formatted_part)
-            formatted_part = re.sub(r'\s*,\s*', ', ', formatted_part)
-            formatted_part = re.sub(r'\s*;\s*', '; ', formatted_part)
-            formatted_part = formatted_part.replace('TEMP_ARROW', '->')
-            formatted_part = re.sub(r'\b(if|for|while|switch)\s*\(', r'\1 (',
-                                    formatted_part)
-            formatted_parts.append(formatted_part)
-        result = "".join(formatted_parts)
-        return re.sub(r'\s{2,}', ' ', result).strip()
+        # 快速路径：不含任何操作符、标点、引号或括号的行 (如纯标识符、`}`)
+        # 只需要合并多余空白
+        if MarkdownCleaner._LINE_TOKEN_CHARS.isdisjoint(line):
+            result = line
+        else:
+            result = MarkdownCleaner._LINE_TOKEN_PATTERN.sub(
+                MarkdownCleaner._space_line_token, line)
+        return MarkdownCleaner._MULTISPACE_PATTERN.sub(' ', result).strip()
 
     @staticmethod
     def _format_code_indentation(code_text: str) -> str:
         """对代码块应用基于花括号的缩进，并格式化符号间距。"""
         indented_code = []
+        append = indented_code.append
+        format_spacing = MarkdownCleaner._format_line_spacing
+        # 代码中大量重复的行 (如 `}`、`break;`) 只需格式化一次
+        formatted_lines = {}
+        indents = MarkdownCleaner._INDENTS
         indent_level = 0
-        indent_size = 4
         for line in code_text.split('\n'):
             clean_line = line.strip()
             if not clean_line:
-                indented_code.append("")
+                append("")
                 continue
-            formatted_line = MarkdownCleaner._format_line_spacing(clean_line)
-            if clean_line.startswith('}') or clean_line.startswith(
-                    'case ') or clean_line.startswith('default:'):
-                indent_level = max(0, indent_level - 1)
-            current_indent = ' ' * (indent_level * indent_size)
-            indented_code.append(current_indent + formatted_line)
-            if clean_line.endswith('{') or clean_line.endswith(':'):
+            if clean_line.startswith(MarkdownCleaner._DEDENT_PREFIXES):
+                if indent_level:
+                    indent_level -= 1
+            if indent_level >= len(indents):
+                indents.append(' ' * (indent_level * 4))
+            formatted_line = formatted_lines.get(clean_line)
+            if formatted_line is None:
+                formatted_line = format_spacing(clean_line)
+                formatted_lines[clean_line] = formatted_line
+            append(indents[indent_level] + formatted_line)
+            if clean_line.endswith(MarkdownCleaner._INDENT_SUFFIXES):
                 indent_level += 1
         return '\n'.join(indented_code)
 
@@ -152,7 +303,8 @@ class MarkdownCleaner:
         lang = ''
         if lines:
             first_line = lines[0].strip()
-            lang_match = re.fullmatch(r'([a-zA-Z0-9+#.-]+)', first_line)
+            lang_match = MarkdownCleaner._LANG_NAME_PATTERN.fullmatch(
+                first_line)
             if lang_match:
                 lang = lang_match.group(1).lower()
                 content = '\n'.join(lines[1:])
@@ -171,11 +323,21 @@ class MarkdownCleaner:
     @staticmethod
     def _clean_code_block_content(match: Match) -> str:
         """回调：清理和格式化已识别的标准代码块内部。"""
-        lang = (match.group(1) or '').lower()
-        content = match.group(2)
+        return MarkdownCleaner._clean_code_block(
+            (match.group(1) or '').lower(), match.group(2))
+
+    @staticmethod
+    def _clean_code_block(lang: str, content: str) -> str:
+        """清理和格式化单个代码块，返回包含围栏的完整代码块文本。"""
+        # 步骤 1 和步骤 4 只处理反斜杠，其余步骤不会引入反斜杠，
+        # 因此代码块中没有反斜杠时可以一并跳过
+        has_backslash = '\\' in content
 
         # 步骤 1: 移除由 Pandoc 添加的多余行尾反斜杠
-        cleaned_content = re.sub(r'\\\s*$', '', content, flags=re.MULTILINE)
+        cleaned_content = content
+        if has_backslash:
+            cleaned_content = MarkdownCleaner._TRAILING_BACKSLASH_PATTERN.sub(
+                '', cleaned_content)
 
         # 步骤 2: (移入此函数) 优先修复所有格式错误的注释块
         cleaned_content = MarkdownCleaner._MALFORMED_COMMENT_PATTERN.sub(
@@ -187,49 +349,47 @@ class MarkdownCleaner:
                 r'\1', cleaned_content))
 
         # 步骤 4: 清理转义的方括号
-        cleaned_content = cleaned_content.replace(r'\[',
-                                                  '[').replace(r'\]', ']')
+        # (两次 str.replace 都在 C 层完成，实测比单次 re.sub 或 translate 更快)
+        if has_backslash:
+            cleaned_content = cleaned_content.replace(r'\[', '[').replace(
+                r'\]', ']')
 
         # 步骤 5: 移除代码块内错误的 Markdown 加粗
-        cleaned_content = re.sub(r'\*\*(.*?)\*\*',
-                                 r'\1',
-                                 cleaned_content,
-                                 flags=re.DOTALL)
+        cleaned_content = MarkdownCleaner._BOLD_PATTERN.sub(
+            r'\1', cleaned_content)
 
         # 步骤 6: (新逻辑) 保护注释，然后清理错误的斜体
         # 这是一个更稳健的方法，可以防止清理规则意外破坏 C 风格的注释
-
-        # 匹配 C 风格的注释 (块注释和行注释)
-        comment_pattern = re.compile(r'/\*.*?\*/|//.*', re.DOTALL)
-        comments = []
-
-        # 定义一个回调函数，用于将注释替换为占位符
-        def comment_replacer(m):
-            comments.append(m.group(0))
-            return f"__COMMENT_PLACEHOLDER_{len(comments)-1}__"
-
-        # 用占位符替换所有注释
-        content_without_comments = comment_pattern.sub(comment_replacer,
-                                                       cleaned_content)
-
-        # 现在，在没有注释的文本上，可以安全地移除错误的斜体格式了
-        # 只移除内容不含中文字符的星号对
-        content_without_comments = re.sub(r'\*([^\u4e00-\u9fa5*]+)\*', r'\1',
-                                          content_without_comments)
-
-        # 将注释恢复到原文中
-        cleaned_content_final = content_without_comments
-        for i, comment in enumerate(comments):
-            cleaned_content_final = cleaned_content_final.replace(
-                f"__COMMENT_PLACEHOLDER_{i}__", comment)
-
-        cleaned_content = cleaned_content_final
+        # (没有星号时斜体清理不会改变任何内容，整个步骤可以跳过)
+        if '*' in cleaned_content:
+            comments = []
+
+            # 定义一个回调函数，用于将注释替换为占位符
+            def comment_replacer(m):
+                comments.append(m.group(0))
+                return f'\x00{len(comments) - 1}\x00'
+
+            # 用占位符替换所有注释
+            content_without_comments = MarkdownCleaner._C_COMMENT_PATTERN.sub(
+                comment_replacer, cleaned_content)
+
+            # 现在，在没有注释的文本上，可以安全地移除错误的斜体格式了
+            # 只移除内容不含中文字符的星号对
+            content_without_comments = (
+                MarkdownCleaner._NON_CJK_ITALIC_PATTERN.sub(
+                    r'\1', content_without_comments))
+
+            # 将注释恢复到原文中 (一次扫描还原全部占位符)
+            if comments:
+                content_without_comments = (
+                    MarkdownCleaner._COMMENT_PLACEHOLDER_PATTERN.sub(
+                        lambda m: comments[int(m.group(1))],
+                        content_without_comments))
+
+            cleaned_content = content_without_comments
 
         # 步骤 7 (原步骤 6): 对特定语言应用自动缩进和间距格式化
-        c_family_langs = [
-            'c', 'cpp', 'c++', 'java', 'javascript', 'js', 'c#', 'cs'
-        ]
-        if lang in c_family_langs:
+        if lang in MarkdownCleaner._C_FAMILY_LANGS:
             formatted_content = MarkdownCleaner._format_code_indentation(
                 cleaned_content)
             return f'```{lang}\n{formatted_content.strip()}\n```'
@@ -251,36 +411,29 @@ class MarkdownCleaner:
     @staticmethod
     def _is_table_line(line: str) -> bool:
         """检查一行是否是Markdown表格或文本表格的一部分"""
-        stripped = line.strip()
-        
-        # 检测标准Markdown表格（使用 | 符号）
-        if '|' in stripped:
-            # 表格分隔行的特征：包含 | 和 - 以及可能的 :
-            if re.match(r'^\s*\|[\s\-:|]+\|\s*$', stripped):
-                return True
-            # 普通表格行：包含 | 分隔的内容
-            if stripped.startswith('|') or stripped.endswith('|'):
-                return True
-            # 行中有多个 | 符号
-            if stripped.count('|') >= 2:
-                return True
-        
-        # 检测飞书文本表格格式
-        # 1. 表格边框行：主要由 - 字符组成，可能有空格分隔
-        if re.match(r'^\s*[-\s]+[-]+[-\s]*$', stripped) and len(stripped) > 10:
-            # 至少10个字符长，主要由 - 和空格组成
-            dash_count = stripped.count('-')
-            if dash_count >= 5:  # 至少5个短横线
-                return True
-        
-        # 2. 表格数据行：前面有空格缩进，包含多个空格分隔的列
-        # 这种行通常有多个连续空格用于列对齐
-        if re.search(r'\s{3,}', line):  # 包含3个或更多连续空格
-            # 进一步检查：不是代码块或其他特殊格式
-            if not stripped.startswith('#') and not stripped.startswith('>'):
-                return True
-        
-        return False
+        # 快速路径：既没有 | 也没有 - 时，只可能是以连续空格对齐的文本表格数据行
+        if '|' not in line and '-' not in line:
+            return (MarkdownCleaner._TEXT_TABLE_COLUMN_PATTERN.search(line)
+                    is not None and not line.lstrip().startswith(('#', '>')))
+        return MarkdownCleaner._TABLE_LINE_PATTERN.match(line) is not None
+
+    @staticmethod
+    def _replace_inline_tag(match: Match) -> str:
+        """回调函数：<br> 转为换行，<em>/<strong> 直接移除。"""
+        return '\n' if match.group(0)[1] in 'bB' else ''
+
+    @staticmethod
+    def _replace_leftover_artifact(match: Match) -> str:
+        """回调函数：&amp; 解码为 &，残留的表格标签直接移除。"""
+        return '&' if match.group(0)[0] == '&' else ''
+
+    @staticmethod
+    def _strip_backslashes_outside_table(match: Match) -> str:
+        """回调：保护表格行，非表格行则移除多余的转义反斜杠。"""
+        line = match.group(0)
+        if MarkdownCleaner._is_table_line(line):
+            return line
+        return line.replace('\\', '')
 
     @staticmethod
     def _is_code_block_marker(border_line: str, next_line: str = '') -> bool:
@@ -288,102 +441,99 @@ class MarkdownCleaner:
         stripped_border = border_line.strip()
         
         # 代码块边框：连续的短横线，没有空格分隔
-        if re.match(r'^-{3,}$', stripped_border):
+        if MarkdownCleaner._DASH_RUN_PATTERN.match(stripped_border):
             # 进一步检查下一行是否是编程语言名称
             if next_line:
                 next_stripped = next_line.strip().lower()
-                # 常见编程语言列表
-                code_langs = [
-                    'c', 'cpp', 'c++', 'java', 'python', 'javascript', 'js',
-                    'typescript', 'ts', 'go', 'rust', 'ruby', 'php', 'swift',
-                    'kotlin', 'scala', 'perl', 'shell', 'bash', 'sh', 'sql',
-                    'html', 'css', 'xml', 'json', 'yaml', 'markdown', 'md',
-                    'text', 'txt', 'cs', 'c#', 'vb', 'matlab', 'r', 'lua'
-                ]
-                if next_stripped in code_langs:
+                if next_stripped in MarkdownCleaner._CODE_LANGS:
                     return True
             return True  # 纯连续短横线也视为代码块
         return False
 
     @staticmethod
     def _convert_text_table_to_markdown(text: str) -> str:
-        """将飞书文本表格转换为标准Markdown表格"""
-        lines = text.split('\n')
-        result_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # 检测短横线边框
-            if re.match(r'^[-\s]+[-]+[-\s]*$', stripped) and len(stripped) > 10:
-                dash_count = stripped.count('-')
-                if dash_count >= 5:
-                    # 检查是否是代码块而非表格
-                    next_line = lines[i + 1].strip() if i + 1 < len(lines) else ''
-                    if MarkdownCleaner._is_code_block_marker(stripped, next_line):
-                        # 这是代码块，不是表格，直接添加
-                        result_lines.append(line)
-                        i += 1
-                        continue
-                    
-                    # 检查边框格式：表格边框通常有空格分隔
-                    if ' ' not in stripped:
-                        # 没有空格的连续短横线更可能是代码块
-                        result_lines.append(line)
-                        i += 1
-                        continue
-                    
-                    # 确认是表格，收集表格内容
-                    table_rows = []
-                    i += 1  # 跳过开始边框
-                    
-                    # 收集表格行直到遇到结束边框
-                    while i < len(lines):
-                        current_line = lines[i]
-                        current_stripped = current_line.strip()
-                        
-                        # 检查是否是结束边框
-                        if re.match(r'^[-\s]+[-]+[-\s]*$', current_stripped):
-                            break
-                        
-                        # 收集非空行
-                        if current_stripped:
-                            table_rows.append(current_stripped)
-                        
-                        i += 1
-                    
-                    # 转换表格行为Markdown格式
-                    if table_rows:
-                        markdown_rows = []
-                        for row in table_rows:
-                            # 使用多个空格分割列（至少3个连续空格）
-                            columns = re.split(r'\s{3,}', row.strip())
-                            # 过滤空列
-                            columns = [col.strip() for col in columns if col.strip()]
-                            if columns:
-                                markdown_row = '| ' + ' | '.join(columns) + ' |'
-                                markdown_rows.append(markdown_row)
-                        
-                        if markdown_rows:
-                            # 添加转换后的表格
-                            result_lines.extend(markdown_rows)
-                            # 添加表格分隔行（根据列数）
-                            if markdown_rows:
-                                first_row_cols = markdown_rows[0].count('|') - 1
-                                separator = '| ' + ' | '.join(['---'] * first_row_cols) + ' |'
-                                # 在第一行后插入分隔符
-                                result_lines.insert(len(result_lines) - len(markdown_rows) + 1, separator)
-                    
-                    i += 1  # 跳过结束边框
-                    continue
-            
-            # 非表格行，直接添加
-            result_lines.append(line)
-            i += 1
-        
-        return '\n'.join(result_lines)
+        """
+        将飞书文本表格转换为标准Markdown表格。
+
+        通过正则定位仅由短横线和空白组成的边框行，在原文上按切片拼接结果；
+        文中没有表格时直接返回原字符串。
+        """
+        border = MarkdownCleaner._TEXT_TABLE_LINE_PATTERN.search(text)
+        if border is None:
+            return text
+
+        parts = []  # 每个元素代表一行或多行，最终以换行符连接
+        position = 0  # 下一段尚未输出的内容的起始位置 (总在行首)
+        while border is not None:
+            line_start, line_end = border.span()
+            stripped = border.group(0).strip()
+
+            # 检测短横线边框（至少11个字符，至少5个短横线）
+            if not MarkdownCleaner._TEXT_TABLE_START_PATTERN.match(stripped):
+                border = MarkdownCleaner._TEXT_TABLE_LINE_PATTERN.search(
+                    text, line_end + 1)
+                continue
+
+            # 检查是否是代码块而非表格；表格边框通常有空格分隔，
+            # 没有空格的连续短横线更可能是代码块
+            next_end = text.find('\n', line_end + 1)
+            next_line = text[line_end + 1:next_end if next_end >= 0 else None]
+            if (MarkdownCleaner._is_code_block_marker(stripped,
+                                                      next_line.strip())
+                    or ' ' not in stripped):
+                border = MarkdownCleaner._TEXT_TABLE_LINE_PATTERN.search(
+                    text, line_end + 1)
+                continue
+
+            # 确认是表格，表格内容一直延续到结束边框 (或文末)
+            end_border = MarkdownCleaner._TEXT_TABLE_LINE_PATTERN.search(
+                text, line_end + 1)
+            if end_border is not None:
+                rows_text = text[line_end + 1:end_border.start()]
+                table_end = end_border.end()
+            else:
+                rows_text = text[line_end + 1:]
+                table_end = len(text)
+
+            if line_start > position:
+                parts.append(text[position:line_start - 1])
+            table_rows = [
+                row.strip() for row in rows_text.split('\n') if row.strip()
+            ]
+            markdown_rows = MarkdownCleaner._text_table_rows_to_markdown(
+                table_rows)
+            if markdown_rows:
+                parts.append('\n'.join(markdown_rows))
+
+            # 跳过结束边框及其后的换行符
+            position = table_end + 1
+            border = MarkdownCleaner._TEXT_TABLE_LINE_PATTERN.search(
+                text, position)
+
+        if position <= len(text):
+            parts.append(text[position:])
+        return '\n'.join(parts)
+
+    @staticmethod
+    def _text_table_rows_to_markdown(table_rows: List[str]) -> List[str]:
+        """将文本表格的数据行转换为 Markdown 表格行，分隔行紧跟在第一行之后。"""
+        markdown_rows = []
+        separator = None
+        for row in table_rows:
+            # 使用多个空格分割列（至少3个连续空格）
+            columns = MarkdownCleaner._TEXT_TABLE_COLUMN_PATTERN.split(row)
+            # 过滤空列
+            columns = [col.strip() for col in columns if col.strip()]
+            if not columns:
+                continue
+            markdown_row = '| ' + ' | '.join(columns) + ' |'
+            markdown_rows.append(markdown_row)
+            if separator is None:
+                # 添加表格分隔行（根据第一行的列数）
+                first_row_cols = markdown_row.count('|') - 1
+                separator = '| ' + ' | '.join(['---'] * first_row_cols) + ' |'
+                markdown_rows.append(separator)
+        return markdown_rows
 
     @staticmethod
     def clean_string(md_text: str) -> str:
@@ -396,50 +546,253 @@ class MarkdownCleaner:
         Returns:
             清理和修复后的 Markdown 文本。
         """
-        # 步骤 0.5: 转换飞书文本表格为Markdown表格
-        text = MarkdownCleaner._convert_text_table_to_markdown(md_text)
+        return MarkdownCleaner._clean_text(md_text).strip()
+
+    @staticmethod
+    def _clean_text(md_text: str) -> str:
+        """
+        执行全部清理步骤，但保留首尾空白，便于分块处理后再拼接。
+
+        每个步骤先用子串探测其标志字符是否存在，不存在时跳过整篇扫描。
+        探测条件只是必要条件，不会改变任何步骤的结果。
+        """
+        # 完全不含 Pandoc 转换痕迹的文本 (如已清理过的文档) 直接返回
+        if not MarkdownCleaner._may_contain_artifacts(md_text):
+            return md_text
+
+        text = md_text
+
+        # 步骤 0.5: 转换飞书文本表格为Markdown表格 (边框行至少包含5个短横线)
+        if text.count('-') >= 5:
+            text = MarkdownCleaner._convert_text_table_to_markdown(text)
         
         # 步骤 1: 结构性修复与转换
-        text = MarkdownCleaner._DASHED_BLOCK_PATTERN.sub(
-            MarkdownCleaner._convert_dashed_block, text)
-        text = MarkdownCleaner._TD_TAG_PATTERN.sub(
-            MarkdownCleaner._handle_td_tag, text)
+        if '---' in text:
+            text = MarkdownCleaner._DASHED_BLOCK_PATTERN.sub(
+                MarkdownCleaner._convert_dashed_block, text)
+        if '<' in text:
+            text = MarkdownCleaner._TD_TAG_PATTERN.sub(
+                MarkdownCleaner._handle_td_tag, text)
 
         # 步骤 2: 关键内容修复 (图片和转义)
-        text = MarkdownCleaner._IMAGE_LINK_PATTERN.sub(
-            MarkdownCleaner._clean_image_path, text)
-        text = re.sub(r'^\s*\\\*', r' *', text, flags=re.MULTILINE)
-
-        # 步骤 2.5: 智能移除反斜杠 - 保护表格行
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            if MarkdownCleaner._is_table_line(line):
-                # 保护表格行，不移除反斜杠
-                cleaned_lines.append(line)
-            else:
-                # 非表格行，移除多余的转义反斜杠
-                cleaned_lines.append(line.replace('\\', ''))
-        text = '\n'.join(cleaned_lines)
+        if '![' in text:
+            text = MarkdownCleaner._IMAGE_LINK_PATTERN.sub(
+                MarkdownCleaner._clean_image_path, text)
+        if '\\' in text:
+            if '\\*' in text:
+                text = MarkdownCleaner._ESCAPED_STAR_PATTERN.sub(r' *', text)
+
+            # 步骤 2.5: 智能移除反斜杠 - 保护表格行
+            # 只有包含反斜杠的行才需要判断是否为表格行
+            text = MarkdownCleaner._BACKSLASH_LINE_PATTERN.sub(
+                MarkdownCleaner._strip_backslashes_outside_table, text)
 
         # 步骤 3: 代码块内部处理 (包含所有注释修复和格式化)
-        text = MarkdownCleaner._CODE_BLOCK_PATTERN.sub(
-            MarkdownCleaner._clean_code_block_content, text)
-
-        # 步骤 4: 通用 HTML 和格式清理
-        text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</?(em|strong)>', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'&amp;', '&', text, flags=re.IGNORECASE)
-        remaining_tags = r'</?(?:td|tr|tbody|table|colgroup|col)[^>]*>'
-        text = re.sub(remaining_tags, '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        if '```' in text:
+            text = MarkdownCleaner._clean_code_blocks(text)
+
+        # 步骤 4: 通用 HTML 和格式清理 (两遍扫描完成标签移除与实体解码)
+        if '<' in text:
+            text = MarkdownCleaner._HTML_INLINE_PATTERN.sub(
+                MarkdownCleaner._replace_inline_tag, text)
+        if '<' in text or '&' in text:
+            text = MarkdownCleaner._HTML_LEFTOVER_PATTERN.sub(
+                MarkdownCleaner._replace_leftover_artifact, text)
+        # 标签移除后可能留下新的空行，因此空行合并需在其后单独进行
+        if '\n\n\n' in text:
+            text = MarkdownCleaner._EXCESS_NEWLINES_PATTERN.sub('\n\n', text)
 
         # 最终步骤：全局清理任何残留的非法星号格式
         # (已注释掉) 这个规则过于宽泛，可能会错误地修改合法的 Markdown 格式，
         # 例如将 `**中文**` 破坏。正确的做法是仅在代码块内部进行此类清理。
         # text = re.sub(r'\*([^\u4e00-\u9fa5*]+)\*', r'\1', text)
 
-        return text.strip()
+        return text
+
+    @staticmethod
+    def _may_contain_artifacts(text: str) -> bool:
+        """
+        快速判断文本中是否可能存在任何清理步骤需要处理的内容。
+
+        逐个使用子串查找 (C 层的快速搜索)，实测比合并成一个正则的单次扫描更快。
+        """
+        for marker in MarkdownCleaner._ARTIFACT_MARKERS:
+            if marker in text:
+                return True
+        # 飞书文本表格的边框行至少包含5个短横线，且不一定连续
+        return text.count('-') >= 5
+
+    @staticmethod
+    def _clean_code_blocks(text: str) -> str:
+        """
+        清理文本中的所有标准代码块。
+
+        代码块多于一个且内容总量超过阈值时，使用进程池并行清理；
+        进程池不可用时自动退回顺序处理。结果通过切片一次性拼接。
+        """
+        matches = list(MarkdownCleaner._CODE_BLOCK_PATTERN.finditer(text))
+        if not matches:
+            return text
+        langs = [(match.group(1) or '').lower() for match in matches]
+        contents = [match.group(2) for match in matches]
+
+        cleaned_blocks = None
+        # 优先按进程可用的 CPU 数计算 (容器或绑核环境下小于 cpu_count)
+        if hasattr(os, 'sched_getaffinity'):
+            workers = len(os.sched_getaffinity(0))
+        else:
+            workers = os.cpu_count() or 1
+        if (workers > 1 and len(matches) > 1 and sum(map(len, contents)) >
+                MarkdownCleaner._PARALLEL_MIN_CHARS):
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    cleaned_blocks = list(
+                        executor.map(_clean_code_block,
+                                     langs,
+                                     contents,
+                                     chunksize=max(1, len(matches) //
+                                                   (workers * 4))))
+            except (OSError, BrokenProcessPool):
+                # 无法创建子进程或子进程异常退出时退回顺序处理
+                cleaned_blocks = None
+        if cleaned_blocks is None:
+            cleaned_blocks = [
+                MarkdownCleaner._clean_code_block(lang, content)
+                for lang, content in zip(langs, contents)
+            ]
+
+        pieces = []
+        last_end = 0
+        for match, block in zip(matches, cleaned_blocks):
+            pieces.append(text[last_end:match.start()])
+            pieces.append(block)
+            last_end = match.end()
+        pieces.append(text[last_end:])
+        return ''.join(pieces)
+
+    @staticmethod
+    def _iter_chunks(lines: Iterable[str]) -> Iterator[str]:
+        """
+        将按行读取的文档切分为可独立清理的块。
+
+        仅在 "空行 + 标题行" 处切分，且切分点不能位于代码块、`---` 块、
+        飞书文本表格、<td> 单元格、未闭合的表格标签或图片链接内部，
+        从而保证逐块清理的结果与整篇清理一致。
+        切分处的空行不包含在任何块中，由调用方补回。
+        """
+        buffer: List[str] = []
+        size = 0
+        previous = ''
+        in_text_table = False
+        fence_line = None  # 未闭合的 ``` 所在行号
+        dash_line = None  # 未闭合的 `---` 块起始行号
+        dash_leading = False
+        td_open = False
+        tag_open = False  # 上一行结束时仍有未闭合的表格标签
+        image_open = False
+        # 不同结构相互嵌套时，前面的步骤会改变后续步骤的配对方式，
+        # 此后不再切分，剩余内容整体处理
+        nested = False
+
+        for index, line in enumerate(lines):
+            if (size >= MarkdownCleaner._CHUNK_SIZE and not nested
+                    and line.startswith('#') and previous == '\n'
+                    and not in_text_table and fence_line is None
+                    and dash_line is None and not td_open and not tag_open
+                    and not image_open):
+                buffer.pop()
+                yield ''.join(buffer)
+                buffer = []
+                size = 0
+
+            buffer.append(line)
+            size += len(line)
+            previous = line
+            if nested:
+                continue
+
+            stripped = line.strip()
+            table_start = (not in_text_table and ' ' in stripped and
+                           MarkdownCleaner._TEXT_TABLE_START_PATTERN.match(
+                               stripped) is not None)
+            dash_run = (not in_text_table and
+                        MarkdownCleaner._DASH_RUN_PATTERN.match(stripped)
+                        is not None)
+            td_tags = (MarkdownCleaner._TD_BOUNDARY_PATTERN.findall(line)
+                       if '<' in line else [])
+            # 未闭合的表格标签一直延续到下一个 '>'；<br> 等标签在此之前
+            # 已被移除，其中的 '>' 不计在内
+            tag_text = (MarkdownCleaner._HTML_INLINE_PATTERN.sub('', line)
+                        if '<' in line else line)
+            tag_closed = tag_open and '>' in tag_text
+            if tag_open:
+                tag_text = (tag_text[tag_text.index('>') + 1:]
+                            if tag_closed else '')
+            tag_end_open = (
+                '<' in tag_text and
+                MarkdownCleaner._OPEN_TABLE_TAG_PATTERN.search(tag_text)
+                is not None)
+            image_start = line.rfind('![')
+
+            involved = (
+                (in_text_table or table_start) +
+                (fence_line is not None or '```' in line) +
+                (dash_line is not None or dash_run) +
+                (td_open or bool(td_tags)) +
+                (tag_open or tag_end_open) +
+                (image_open or image_start >= 0))
+            if involved > 1:
+                nested = True
+                continue
+
+            # 飞书文本表格：与 _convert_text_table_to_markdown 的状态保持一致
+            if in_text_table:
+                if MarkdownCleaner._TEXT_TABLE_BORDER_PATTERN.match(stripped):
+                    in_text_table = False
+            elif table_start:
+                in_text_table = True
+            elif dash_run:
+                # `---` 块的闭合边框至少要在块内首个非空行之后
+                if dash_line is None:
+                    dash_line = index
+                    dash_leading = True
+                elif index >= dash_line + 2:
+                    dash_line = None
+            if dash_line is not None and dash_leading and index > dash_line:
+                # 起始边框会贪婪地吞掉其后的空白行
+                if stripped:
+                    dash_leading = False
+                else:
+                    dash_line = index
+
+            position = line.find('```')
+            while position >= 0:
+                if fence_line is None:
+                    fence_line = index
+                elif position == 0 and index >= fence_line + 2:
+                    fence_line = None
+                position = line.find('```', position + 3)
+
+            for tag in td_tags:
+                td_open = tag[1] != '/'
+            if tag_end_open:
+                tag_open = True
+            elif tag_closed:
+                tag_open = False
+
+            if image_start >= 0:
+                image_open = not MarkdownCleaner._IMAGE_LINK_PATTERN.search(
+                    line, image_start)
+
+        if buffer:
+            yield ''.join(buffer)
+
+    @staticmethod
+    def _encode_output(text: str) -> bytes:
+        """将文本编码为 UTF-8，换行符与文本模式写入时一致 (Windows 下为 CRLF)。"""
+        if os.linesep != '\n':
+            text = text.replace('\n', os.linesep)
+        return text.encode('utf-8')
 
     def clean(self) -> None:
         """
@@ -447,12 +800,37 @@ class MarkdownCleaner:
         """
         try:
             print(f"正在读取输入文件: {self.input_file}")
-            with open(self.input_file, 'r', encoding='utf-8') as f_in:
-                markdown_content = f_in.read()
-            cleaned_result = self.clean_string(markdown_content)
             print(f"正在将处理后的内容写入输出文件: {self.output_file}")
-            with open(self.output_file, 'w', encoding='utf-8') as f_out:
-                f_out.write(cleaned_result)
+            # 输出以二进制模式写入，每块只编码一次，避免文本层的逐次编码开销。
+            # 结果先写入临时文件，成功后再替换输出文件；这样出错时不会留下
+            # 不完整的输出，输入与输出是同一个文件时也不会在读取前被清空
+            temp_filepath = self.output_file + '.tmp'
+            try:
+                with open(self.input_file, 'r', encoding='utf-8') as f_in, \
+                        open(temp_filepath, 'wb') as f_out:
+                    # 逐块清理并写出；块之间的空白暂存起来，
+                    # 以便与整篇处理一样合并多余空行并去除首尾空白
+                    pending = None
+                    for index, chunk in enumerate(self._iter_chunks(f_in)):
+                        piece = self._clean_text(chunk)
+                        if index:
+                            piece = '\n' + piece  # 补回切分处的空行
+                        body = piece.strip()
+                        if not body:
+                            if pending is not None:
+                                pending += piece
+                            continue
+                        lead = piece[:piece.index(body[0])]
+                        if pending is not None:
+                            f_out.write(self._encode_output(
+                                self._EXCESS_NEWLINES_PATTERN.sub(
+                                    '\n\n', pending + lead)))
+                        f_out.write(self._encode_output(body))
+                        pending = piece[len(lead) + len(body):]
+                os.replace(temp_filepath, self.output_file)
+            finally:
+                if os.path.exists(temp_filepath):
+                    os.remove(temp_filepath)
             print("文件处理完成！")
         except FileNotFoundError:
             print(f"错误: 输入文件未找到 -> {self.input_file}", file=sys.stderr)
@@ -462,6 +840,11 @@ class MarkdownCleaner:
             sys.exit(1)
 
 
+def _clean_code_block(lang: str, content: str) -> str:
+    """进程池工作函数：清理单个代码块 (需位于模块顶层才能被序列化)。"""
+    return MarkdownCleaner._clean_code_block(lang, content)
+
+
 def main() -> None:
     """
     主函数，用于解析命令行参数并执行文件清理操作。
@@ -19,39 +19,57 @@ Markdown 代码块修复与重构工具 (markdown_repair.py)
 - 支持交互式地为代码块指定语言类型。
 """
 
+import mmap
+import os
 import re
 import sys
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, TextIO, Tuple
 
 
 class CodeBlockProcessor:
     """
     一个用于查找、解析和重构 Markdown 代码块的类。
     """
-    KNOWN_LANGUAGES = {
+    KNOWN_LANGUAGES = frozenset({
         'c', 'cpp', 'c++', 'python', 'py', 'java', 'javascript', 'js', 'html',
         'css', 'yaml', 'bash', 'shell', 'sh', 'sql', 'go', 'rust',
         'typescript', 'ts', 'markdown', 'json', 'xml', 'ruby', 'php'
-    }
+    })
+
+    # 预编译的正则表达式
+    _FUSED_FENCE_PATTERN = re.compile(r"^(```\s*)(```.*)$", re.MULTILINE)
+    _IDENTIFIER_PATTERN = re.compile(r'[a-zA-Z0-9_.-]+')
+    _TRAILING_BACKSLASH_PATTERN = re.compile(r'\\\s*$', re.MULTILINE)
+    _BOLD_WORD_PATTERN = re.compile(r'(?<!\w)\*\*(\w+)\*\*(?!\w)')
+    _ITALIC_WORD_PATTERN = re.compile(r'(?<!\w)\*(\w+)\*(?!\w)')
+    _FENCE_OPENER_PATTERN = re.compile(r'^```(\S*)\s*(.*)$')
+    # 操作符及其两侧的空白（不跨行）
+    _OPERATOR_PATTERN = re.compile(r'[^\S\n]*([=+\-/])[^\S\n]*')
+    # 会让格式化产生间距或缩进变化的字符
+    _FORMAT_TRIGGER_CHARS = frozenset('{}=+-/')
+
+    def __init__(self, auto: bool = False):
+        """
+        初始化处理器状态。
 
-    def __init__(self):
-        """初始化处理器状态。"""
+        Args:
+            auto: 非交互模式。为 True 时不再询问用户，规范的代码块保留原语言，
+                  不规范的代码块修正为默认语言。
+        """
+        self.auto: bool = auto
         self.mode: Optional[str] = None
         self.target_lang_all: Optional[str] = None
         self.block_count: int = 0
         self.default_lang: str = 'c'  # 默认的备用语言
         self.format_code: bool = True  # (修改) 默认启用代码格式化
-        self.block_finder_regex = re.compile(r"^```[\s\S]+?^```", re.MULTILINE)
 
     def _pre_process_fused_blocks(self, markdown_text: str) -> str:
         """
         (新增) 预处理文本，将紧邻的、可能是错误合并的代码块分隔符拆开。
         例如，将 ` ````` ` 修正为 ` ```\n``` `。
         """
-        corrected_text = re.sub(r"^(```\s*)(```.*)$",
-                                r"\1\n\2",
-                                markdown_text,
-                                flags=re.MULTILINE)
+        corrected_text = self._FUSED_FENCE_PATTERN.sub(r"\1\n\2",
+                                                   markdown_text)
         if corrected_text != markdown_text:
             print("检测到并已分离错误合并的代码块分隔符。")
 
@@ -61,10 +79,9 @@ class CodeBlockProcessor:
         """(已重构) 根据上下文，检查字符串是否为合法的语言或标题标识符。"""
         if not identifier:
             return True
-        if not re.fullmatch(r'[a-zA-Z0-9_.-]+', identifier):
+        # 合法标识符只含 ASCII 字符，因此不可能是 '演示'，无需再比较
+        if not self._IDENTIFIER_PATTERN.fullmatch(identifier):
             return False
-        if identifier.lower() == '演示':
-            return True
 
         if context == 'first_part':
             return identifier.lower() in self.KNOWN_LANGUAGES
@@ -78,34 +95,42 @@ class CodeBlockProcessor:
 
     def _process_dashed_content(self, content: str) -> str:
         """(新增) 处理一个 '---' 块的内部内容并将其转换为 ``` 块字符串。"""
-        content = re.sub(r'\\\s*$', '', content, flags=re.MULTILINE).strip()
+        content = self._TRAILING_BACKSLASH_PATTERN.sub('', content).strip()
         lines = content.split('\n')
         lang, title = '', ''
-        while lines and not lines[0].strip():
-            lines.pop(0)
-        if lines and self._validate_identifier(lines[0].strip(),
-                                               context='first_part'):
-            lang = lines.pop(0).strip()
-        if lines and self._validate_identifier(lines[0].strip(),
-                                               context='title_line'):
-            title = lines.pop(0).strip()
-        code_lines = lines
+        # 用下标前进代替 pop(0)，最后只切片一次
+        i, n = 0, len(lines)
+        while i < n and not lines[i].strip():
+            i += 1
+        if i < n:
+            candidate = lines[i].strip()
+            if self._validate_identifier(candidate, context='first_part'):
+                lang = candidate
+                i += 1
+        if i < n:
+            candidate = lines[i].strip()
+            if self._validate_identifier(candidate, context='title_line'):
+                title = candidate
+                i += 1
         lang_spec = lang
         if title:
             lang_spec += f" {title}"
-        final_code = '\n'.join(code_lines)
+        final_code = '\n'.join(lines[i:])
         return f"```{lang_spec}\n{final_code}\n```"
 
     def _clean_code_content(self, code_text: str) -> str:
         """
         (新增) 清理代码块内部的文本，移除 Pandoc 错误添加的强调符号。
         """
+        # 两个正则都以 '*' 为前提，不含 '*' 时无需进入正则引擎
+        if '*' not in code_text:
+            return code_text
         # 优先处理双星号（加粗），避免与单星号冲突
         # 例如：(void)**pvParameters**; -> (void)pvParameters;
-        cleaned_text = re.sub(r'(?<!\w)\*\*(\w+)\*\*(?!\w)', r'\1', code_text)
+        cleaned_text = self._BOLD_WORD_PATTERN.sub(r'\1', code_text)
         # 处理单星号（斜体）
         # 例如：(void)*pvParameters*; -> (void)pvParameters;
-        cleaned_text = re.sub(r'(?<!\w)\*(\w+)\*(?!\w)', r'\1', cleaned_text)
+        cleaned_text = self._ITALIC_WORD_PATTERN.sub(r'\1', cleaned_text)
         return cleaned_text
 
     def _format_code_content(self, code_text: str) -> str:
@@ -114,49 +139,61 @@ class CodeBlockProcessor:
         - { } 内的代码行进行缩进。
         - =, +, -, / 符号前后添加空格。
         """
+        # 不含任何操作符与大括号时，既无间距调整也无缩进，
+        # 结果仅是逐行去除首尾空白
+        if self._FORMAT_TRIGGER_CHARS.isdisjoint(code_text):
+            return '\n'.join([line.strip()
+                               for line in code_text.split('\n')])
+
+        # ---- 操作符间距逻辑 ----
+        # 对整个代码块一次性添加操作符两侧的空格（空白匹配不跨行），
+        # 再连接被分开的 '*=' / '!='；其余复合操作符在此之后不会出现被分开的形式。
+        # split() 得到 [文本, 操作符, 文本, ...]，以单个空格连接即与
+        # sub(r' \1 ') 结果相同，且省去了逐个匹配展开替换模板的开销
+        processed_text = ' '.join(self._OPERATOR_PATTERN.split(code_text))
+        if '*' in processed_text:
+            processed_text = processed_text.replace('* =', '*=')
+        if '!' in processed_text:
+            processed_text = processed_text.replace('! =', '!=')
+        processed_lines = processed_text.split('\n')
+
+        # (新增) 分隔线保持原样，因此仅在可能存在分隔线时保留原始行用于检查
+        original_lines = (code_text.split('\n') if '---' in code_text
+                          else None)
+
         formatted_lines = []
+        append = formatted_lines.append
         indent_level = 0
         indent_size = 4
 
-        lines = code_text.split('\n')
-
-        for line in lines:
-            # (新增) 检查是否为分隔线，如果是则不进行任何格式化
-            trimmed_for_check = line.strip()
-            if re.fullmatch(r'-{3,}', trimmed_for_check):
-                formatted_lines.append(line)
-                continue
-
-            # ---- 操作符间距逻辑 ----
-            # 1. 在所有目标操作符前后添加空格
-            processed_line = re.sub(r'\s*([=+\-/])\s*', r' \1 ', line)
-
-            # 2. 重新连接被意外分开的复合操作符
-            processed_line = processed_line.replace('+ =', '+=')
-            processed_line = processed_line.replace('- =', '-=')
-            processed_line = processed_line.replace('* =', '*=')
-            processed_line = processed_line.replace('/ =', '/=')
-            processed_line = processed_line.replace('= =', '==')
-            processed_line = processed_line.replace('! =', '!=')
-            processed_line = processed_line.replace('+ +', '++')
-            processed_line = processed_line.replace('- -', '--')
+        for index, processed_line in enumerate(processed_lines):
+            if original_lines is not None:
+                line = original_lines[index]
+                stripped = line.strip()
+                # 等价于 fullmatch(r'-{3,}')：首字符不是 '-' 时立即排除
+                if (stripped[:1] == '-' and len(stripped) >= 3
+                        and not stripped.lstrip('-')):
+                    append(line)
+                    continue
 
             trimmed_line = processed_line.strip()
 
             # ---- 缩进逻辑 ----
             # 如果行以 '}' 开头，则减少缩进
-            if trimmed_line.startswith('}'):
-                indent_level = max(0, indent_level - 1)
+            if indent_level and trimmed_line.startswith('}'):
+                indent_level -= 1
 
-            current_indent = ' ' * (indent_level * indent_size)
-
-            formatted_lines.append(current_indent + trimmed_line)
+            if indent_level:
+                append(' ' * (indent_level * indent_size) + trimmed_line)
+            else:
+                append(trimmed_line)
 
             # 根据大括号的数量更新下一行的缩进级别
-            open_braces = trimmed_line.count('{')
-            close_braces = trimmed_line.count('}')
-            indent_level += (open_braces - close_braces)
-            indent_level = max(0, indent_level)
+            if '{' in trimmed_line or '}' in trimmed_line:
+                indent_level += (trimmed_line.count('{')
+                                 - trimmed_line.count('}'))
+                if indent_level < 0:
+                    indent_level = 0
 
         return '\n'.join(formatted_lines)
 
@@ -165,18 +202,20 @@ class CodeBlockProcessor:
         (已重构) 采用更稳健的逻辑解析代码块的第一行，正确处理语言和标题。
         """
         lines = block_text.split('\n')
-        if lines and not lines[0].strip():
-            lines.pop(0)
-        if lines and not lines[-1].strip():
-            lines.pop(-1)
-        if not lines:
+        # 用下标代替 pop(0)，避免每次删除都整体移动列表
+        start, end = 0, len(lines)
+        if start < end and not lines[start].strip():
+            start += 1
+        if start < end and not lines[end - 1].strip():
+            end -= 1
+        if start == end:
             return '', ''
 
-        first_line = lines[0]
+        first_line = lines[start]
         original_lang = ''
         code_parts = []
 
-        match = re.match(r'^```(\S*)\s*(.*)$', first_line)
+        match = self._FENCE_OPENER_PATTERN.match(first_line)
         if match:
             first_part = match.group(1)
             second_part = match.group(2).strip()
@@ -189,7 +228,7 @@ class CodeBlockProcessor:
                         original_lang += f" {second_part}"
                     else:
                         code_parts.append(second_part)
-            elif first_part.lower() == '演示':
+            elif first_part == '演示':
                 original_lang = '__DEMO__'
                 if second_part:
                     code_parts.append(second_part)
@@ -202,28 +241,35 @@ class CodeBlockProcessor:
             original_lang = '__INVALID__'
             code_parts.append(first_line)
 
-        content_lines = lines[1:-1]
+        body_start, body_end = start + 1, end - 1
 
-        if content_lines and not original_lang:
-            potential_lang = content_lines[0].strip()
+        if body_start < body_end and not original_lang:
+            potential_lang = lines[body_start].strip()
             is_valid_lang = (self._validate_identifier(potential_lang,
                                                        context='first_part')
                              and ' ' not in potential_lang)
             if is_valid_lang:
                 original_lang = potential_lang
-                content_lines.pop(0)
+                body_start += 1
 
         is_simple_lang = (' ' not in original_lang
                           and original_lang not in ['__INVALID__', '__DEMO__'])
-        if content_lines and original_lang and is_simple_lang:
-            potential_title = content_lines[0].strip()
+        if body_start < body_end and original_lang and is_simple_lang:
+            potential_title = lines[body_start].strip()
             if potential_title:
                 if self._validate_identifier(potential_title,
                                              context='title_line'):
                     original_lang = f"{original_lang} {potential_title}"
-                    content_lines.pop(0)
-
-        code_parts.extend(content_lines)
+                    body_start += 1
+
+        code_parts.extend(lines[body_start:body_end])
+        # 去掉末尾的空白行：后续的清理、格式化都不必再处理它们，
+        # 最终的 strip() 通常也无需复制字符串。
+        # (开头的空白行在添加 '演示' 标题时需要保留，因此不作处理)
+        end = len(code_parts)
+        while end and not code_parts[end - 1].strip():
+            end -= 1
+        del code_parts[end:]
         clean_code = '\n'.join(code_parts)
         return original_lang, clean_code
 
@@ -231,11 +277,15 @@ class CodeBlockProcessor:
         """根据用户选择的模式，获取代码块的目标语言。"""
         if self.mode == 'all':
             return self.target_lang_all or ''
+        if self.auto:
+            return original_lang
         print("-" * 60)
         print(f"发现第 {self.block_count} 个代码块 (原语言: "
               f"{original_lang or '未指定'})")
-        snippet = '\n'.join(code.split('\n')[:7])
-        if len(code.split('\n')) > 7:
+        # 只需前 7 行；限定分割次数，避免对大代码块做完整分割
+        preview_lines = code.split('\n', 7)
+        snippet = '\n'.join(preview_lines[:7])
+        if len(preview_lines) > 7:
             snippet += '\n...'
         print("代码片段预览:")
         print(snippet)
@@ -247,10 +297,9 @@ class CodeBlockProcessor:
             return ''
         return user_input or original_lang
 
-    def _replacement_callback(self, match: re.Match) -> str:
-        """这是 re.sub 的核心回调函数，对每个匹配到的代码块进行处理。"""
+    def _process_standard_block(self, full_block_text: str) -> str:
+        """核心处理函数，对每个完整的 '```' 代码块进行解析与重构。"""
         self.block_count += 1
-        full_block_text = match.group(0)
         original_lang, clean_code = self._deconstruct_block(full_block_text)
 
         # 清理代码块内部的强调格式
@@ -275,7 +324,12 @@ class CodeBlockProcessor:
             print("-" * 60)
             print(f"发现第 {self.block_count} 个代码块 ({message})，已自动修正。")
             target_lang = self.default_lang
-            if not clean_code.strip().startswith('演示'):
+            # 只需检查开头，避免对整个代码块做 strip() 复制；
+            # 仅当开头 32 个字符几乎全是空白时才退回完整的 lstrip()
+            head = clean_code[:32].lstrip()
+            if len(head) < 2 and len(clean_code) > 32:
+                head = clean_code.lstrip()
+            if not head.startswith('演示'):
                 final_code = f"演示\n{clean_code}" if clean_code else "演示"
             else:
                 final_code = clean_code
@@ -288,77 +342,77 @@ class CodeBlockProcessor:
             return f"```{target_lang}\n{final_code}\n```"
         return f"```\n{final_code}\n```"
 
-    def _fix_unterminated_blocks(self, markdown_text: str) -> str:
+    @staticmethod
+    def _count_fence_lines(text: str) -> int:
         """
-        (新增) 查找并修复未闭合的代码块，作为最后一步的安全检查。
+        统计文本中代码块分隔行（去除空白后以 ``` 开头且较短的行）的数量。
+        直接定位文本中的 ```，只检查以其开头（忽略前导空白）的行，
+        无需将整篇文本重新分割成行。
         """
-        lines = markdown_text.split('\n')
-        in_block = False
+        count = 0
         fence = '```'
+        find, rfind = text.find, text.rfind
+        pos = find(fence)
+        while pos != -1:
+            line_start = rfind('\n', 0, pos) + 1
+            line_end = find('\n', pos)
+            if line_end == -1:
+                line_end = len(text)
+            if line_start == pos or text[line_start:pos].isspace():
+                stripped = text[pos:line_end].rstrip()
+                if len(stripped) - stripped.count('`') < 15:
+                    count += 1
+            pos = find(fence, line_end)
+        return count
+
+    @staticmethod
+    def _report_unterminated_block() -> None:
+        """提示文件末尾存在未闭合的代码块并已自动补全。"""
+        print("-" * 60)
+        print("警告: 检测到文件末尾存在一个未闭合的代码块。")
+        print("已在文件末尾自动添加闭合标签 '```'。")
 
-        for line in lines:
-            is_fence = (line.strip().startswith(fence)
-                        and len(line.strip().replace('`', '')) < 15)
-            if is_fence:
-                in_block = not in_block
-
-        if in_block:
-            print("-" * 60)
-            print("警告: 检测到文件末尾存在一个未闭合的代码块。")
-            print("已在文件末尾自动添加闭合标签 '```'。")
+    def _fix_unterminated_blocks(self, markdown_text: str) -> str:
+        """
+        (新增) 查找并修复未闭合的代码块，作为最后一步的安全检查。
+        """
+        if self._count_fence_lines(markdown_text) % 2:
+            self._report_unterminated_block()
             return markdown_text.rstrip() + '\n```\n'
 
         return markdown_text
 
-    def run(self, markdown_text: str) -> str:
-        """(已重构) 运行处理器的主函数，采用更稳健的解析逻辑。"""
-        while not self.mode:
-            prompt = ("请选择操作模式:\n"
-                      "  [A] - 将所有代码块转换为同一种语言\n"
-                      "  [I] - 逐个决定每个代码块的语言\n"
-                      "请输入 (A/I): ")
-            choice = input(prompt).strip().lower()
-            if choice in ['a', 'i']:
-                self.mode = 'all' if choice == 'a' else 'individual'
-            else:
-                print("无效输入，请重新选择。")
-
-        # (修改) 移除了格式化功能的询问，现在默认启用
-        print("\n提示: 代码块自动格式化功能已默认启用。")
-
-        if self.mode == 'all':
-            prompt = "请输入统一的目标语言 (例如: java, python, c): "
-            self.target_lang_all = input(prompt).strip().lower()
-            print(f"好的，所有代码块将被转换为 `{self.target_lang_all}`。")
-        else:  # 'individual' 模式
-            prompt = ("请输入用于自动修正的默认语言 (例如: cpp, python)。\n"
-                      "直接按 Enter 将默认为 'c': ")
-            user_default = input(prompt).strip().lower()
-            if user_default:
-                self.default_lang = user_default
-            print(f"好的，所有不规范的代码块将默认被修正为 `{self.default_lang}`。")
-
-        # 步骤 1: 预处理，拆分错误合并的 ``` 代码块
-        print("\n--- 正在预处理错误合并的代码块... ---\n")
-        text = self._pre_process_fused_blocks(markdown_text)
+    def _iter_preprocessed_lines(self, text: str) -> Iterator[str]:
+        """
+        (新引擎) 逐行解析文本并将 '---' 块转换为 ``` 块，按行产出结果。
+        以生成器实现，使后续的代码块处理可以在同一次遍历中完成。
+        """
+        # 文档级预检：不含 '---' 就不可能出现分隔块；两种分隔符都没有时直接逐行产出
+        has_dashes = '---' in text
+        if not has_dashes and '```' not in text:
+            yield from text.split('\n')
+            return
 
-        # 步骤 2: (新引擎) 手动解析并转换 '---' 块，避免歧义
-        print("\n--- 正在预处理自定义 '---' 代码块... ---\n")
-        lines = text.split('\n')
-        output_parts = []
-        buffer = []
+        buffer: List[str] = []
         in_block_type = None  # Can be 'standard', 'dashed', or None
-        dashed_delimiter_regex = re.compile(r"^\s*-{3,}[ \t]*$")
 
-        for line in lines:
-            is_standard_delimiter = (line.strip().startswith('```') and len(
-                line.strip().replace('`', '')) < 15)
-            is_dashed_delimiter = dashed_delimiter_regex.match(line)
+        for line in text.split('\n'):
+            # 按首字符分派，普通文本行无需进一步检查
+            stripped = line.strip()
+            first_char = stripped[:1]
+            is_standard_delimiter = (
+                first_char == '`' and stripped.startswith('```')
+                and len(stripped) - stripped.count('`') < 15)
+            # 等价于 r"^\s*-{3,}[ \t]*$"：行尾只允许空格和制表符
+            is_dashed_delimiter = (
+                has_dashes and first_char == '-' and len(stripped) >= 3
+                and not stripped.lstrip('-')
+                and line.rstrip(' \t').endswith('-'))
 
             if in_block_type == 'standard':
                 buffer.append(line)
                 if is_standard_delimiter:
-                    output_parts.append("\n".join(buffer))
+                    yield from buffer
                     buffer = []
                     in_block_type = None
             elif in_block_type == 'dashed':
@@ -366,7 +420,7 @@ class CodeBlockProcessor:
                     full_content = "\n".join(buffer)
                     converted_block = self._process_dashed_content(
                         full_content)
-                    output_parts.append(converted_block)
+                    yield from converted_block.split('\n')
                     buffer = []
                     in_block_type = None
                 else:
@@ -378,41 +432,147 @@ class CodeBlockProcessor:
                 elif is_dashed_delimiter:
                     in_block_type = 'dashed'
                 else:
-                    output_parts.append(line)
+                    yield line
 
         if buffer:
             if in_block_type == 'standard':
                 print("警告: 检测到文件末尾存在一个未闭合的 '```' 代码块。")
-                output_parts.append("\n".join(buffer))
+                yield from buffer
             elif in_block_type == 'dashed':
                 print("警告: 检测到文件末尾存在一个未闭合的 '---' 代码块。")
-                output_parts.append("-" * 40)
-                output_parts.extend(buffer)
+                yield "-" * 40
+                yield from buffer
 
-        preprocessed_text = "\n".join(output_parts)
+    def run(self, markdown_text: str) -> str:
+        """(已重构) 运行处理器的主函数，采用更稳健的解析逻辑。"""
+        processed_text = "\n".join(self._iter_processed_parts(markdown_text))
 
-        # 步骤 3: 处理所有标准的 '```' 代码块
-        print("\n--- 开始处理标准的 '```' 代码块... ---\n")
-        processed_text = self.block_finder_regex.sub(
-            self._replacement_callback, preprocessed_text)
+        # 步骤 3: 检查并修复未闭合的 '```' 代码块
+        return self._fix_unterminated_blocks(processed_text)
+
+    def run_to_stream(self, markdown_text: str, stream: TextIO) -> None:
+        """
+        与 run() 的处理相同，但结果边处理边写入 stream，
+        不在内存中拼接完整的输出文本。
+        """
+        in_block = False
+        # 暂存末尾的空白：若需补全未闭合的代码块，需先去除这些空白
+        pending: List[str] = []
+        parts = self._iter_processed_parts(markdown_text)
+        for index, part in enumerate(parts):
+            if self._count_fence_lines(part) % 2:
+                in_block = not in_block
+            piece = f"\n{part}" if index else part
+            content = piece.rstrip()
+            if content:
+                stream.write("".join(pending))
+                stream.write(content)
+                pending = [piece[len(content):]]
+            else:
+                pending.append(piece)
+
+        # 步骤 3: 检查并修复未闭合的 '```' 代码块
+        if in_block:
+            self._report_unterminated_block()
+            stream.write('\n```\n')
+        else:
+            stream.write("".join(pending))
 
-        # 步骤 4: 检查并修复未闭合的 '```' 代码块
-        final_text = self._fix_unterminated_blocks(processed_text)
+    def _iter_processed_parts(self, markdown_text: str) -> Iterator[str]:
+        """
+        询问处理模式，然后依次产出处理后的文本片段（以 '\\n' 连接即为结果），
+        尚未包含对未闭合代码块的修复。
+        """
+        if self.auto and not self.mode:
+            self.mode = 'individual'
+            print("非交互模式: 保留代码块原有语言，"
+                  f"不规范的代码块将默认被修正为 `{self.default_lang}`。")
+        while not self.mode:
+            prompt = ("请选择操作模式:\n"
+                      "  [A] - 将所有代码块转换为同一种语言\n"
+                      "  [I] - 逐个决定每个代码块的语言\n"
+                      "请输入 (A/I): ")
+            choice = input(prompt).strip().lower()
+            if choice in ['a', 'i']:
+                self.mode = 'all' if choice == 'a' else 'individual'
+            else:
+                print("无效输入，请重新选择。")
 
-        return final_text
+        # (修改) 移除了格式化功能的询问，现在默认启用
+        print("\n提示: 代码块自动格式化功能已默认启用。")
+
+        if self.mode == 'all':
+            prompt = "请输入统一的目标语言 (例如: java, python, c): "
+            self.target_lang_all = input(prompt).strip().lower()
+            print(f"好的，所有代码块将被转换为 `{self.target_lang_all}`。")
+        elif not self.auto:  # 'individual' 模式
+            prompt = ("请输入用于自动修正的默认语言 (例如: cpp, python)。\n"
+                      "直接按 Enter 将默认为 'c': ")
+            user_default = input(prompt).strip().lower()
+            if user_default:
+                self.default_lang = user_default
+            print(f"好的，所有不规范的代码块将默认被修正为 `{self.default_lang}`。")
+
+        # 步骤 1: 预处理，拆分错误合并的 ``` 代码块
+        print("\n--- 正在预处理错误合并的代码块... ---\n")
+        text = self._pre_process_fused_blocks(markdown_text)
+
+        # 步骤 2: 在同一次逐行遍历中转换 '---' 块并处理所有 '```' 代码块。
+        # 代码块从行首的 ``` 开始，到下一个以 ``` 开头的行结束；
+        # 结束行中 ``` 之后的内容原样保留。
+        print("\n--- 正在解析并处理代码块... ---\n")
+        block_lines: Optional[List[str]] = None
+        for line in self._iter_preprocessed_lines(text):
+            if block_lines is None:
+                if line.startswith('```'):
+                    block_lines = [line]
+                else:
+                    yield line
+            elif line.startswith('```'):
+                block_lines.append('```')
+                yield self._process_standard_block(
+                    "\n".join(block_lines)) + line[3:]
+                block_lines = None
+            else:
+                block_lines.append(line)
+        if block_lines is not None:
+            yield from block_lines
+
+
+def read_text(filepath: str) -> str:
+    """
+    通过 mmap 读取 UTF-8 文本文件，直接从映射的内存解码，省去中间缓冲区的复制。
+    换行符与文本模式读取一致，统一转换为 '\\n'。
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, 'utf-8')
+        except (ValueError, OSError):
+            # 空文件或无法映射的文件，退回普通读取
+            content = f.read().decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
 
 
 def process_file(input_filepath: str, output_filepath: str):
     """读取文件，使用处理器进行重构，然后写入新文件。"""
     try:
         print(f"正在读取文件: '{input_filepath}'...")
-        with open(input_filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = read_text(input_filepath)
         processor = CodeBlockProcessor()
-        corrected_content = processor.run(content)
-        print(f"\n--- 处理完成 ---\n正在将结果写入: '{output_filepath}'...")
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            f.write(corrected_content)
+        # 结果边处理边写入临时文件，成功后再替换输出文件；
+        # 这样出错时不会留下不完整的输出（输入与输出也可能是同一个文件）
+        temp_filepath = output_filepath + '.tmp'
+        try:
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
+                processor.run_to_stream(content, f)
+            os.replace(temp_filepath, output_filepath)
+        finally:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+        print(f"\n--- 处理完成 ---\n结果已写入: '{output_filepath}'")
         print("\n文件处理成功!")
         print(f"总共处理了 {processor.block_count} 个代码块。")
         print(f"输入文件: {input_filepath}")
@@ -13,33 +13,57 @@
 2. 作为独立的命令行脚本:
     在终端中直接运行此文件，并提供需要处理的 Markdown 文件路径。
     脚本会通过命令行 `input()` 与用户进行交互。
+    也可以额外提供一个应答文件（每行一个回答），按顺序代替手动输入，便于批量处理。
 
     用法:
-    python markdown_setting.py <输入文件.md>
+    python markdown_setting.py <输入文件.md> [可选的应答文件]
 
     示例:
     python markdown_setting.py my_notes.md
+    python markdown_setting.py my_notes.md answers.txt
 """
 
+import io
 import os
 import re
 import sys
 import tkinter as tk
 from tkinter import messagebox
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
+
+from markdown_repair import read_text
+
+# 预编译的正则表达式：标准 Markdown 标题
+_HEADER_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$')
+
+
+def _match_bold_header(line: str) -> Optional[str]:
+    r"""
+    判断一行是否为“加粗标题”（整行形如 **标题**），是则返回去除首尾空白的
+    标题文本，否则返回 None。
+
+    与正则 ^\s*\*\*(.*?)\*\*\s*$ 的判断相同，但只用几个字符串方法完成。
+    """
+    stripped = line.strip()
+    if (len(stripped) < 4 or not stripped.startswith('**')
+            or not stripped.endswith('**')):
+        return None
+    return stripped[2:-2].strip()
 
 
 # ==============================================================================
 #  GUI 版本 - 供 main_gui.py 调用
 # ==============================================================================
 class HeaderLevelDialog:
-    """一个自定义对话框，用于选择标题级别。"""
+    """
+    一个自定义对话框，用于选择标题级别。
 
-    def __init__(self, parent, title_text, allow_level_one, header_tree=None):
+    窗口及控件只创建一次，之后每次调用 ask() 时仅更新变化的内容并重新显示，
+    避免为每个候选标题重建整套 Tk 控件。
+    """
+
+    def __init__(self, parent):
         self.parent = parent
-        self.title_text = title_text
-        self.allow_level_one = allow_level_one
-        self.header_tree = header_tree or []
         self.result = None
         
         # 深色主题颜色
@@ -51,18 +75,52 @@ class HeaderLevelDialog:
             'text_bg': '#2a2a2a',
         }
         
-        # 创建顶层窗口
+        # 随每次询问变化的内容
+        self.title_var = tk.StringVar(master=parent)
+        self.instruction_var = tk.StringVar(master=parent)
+        self._done_var = tk.BooleanVar(master=parent, value=False)
+        self.level_buttons = {}
+        self._tree_len = 0  # 树状图中已显示的标题数量
+        
+        # 创建顶层窗口（创建后先隐藏，等待 ask() 调用）
         self.dialog = tk.Toplevel(parent)
-        self.dialog.title(f"修正标题: 【{self.title_text}】")
         self.dialog.configure(bg=self.colors['bg'])
         self.dialog.transient(parent)
-        self.dialog.grab_set()
+        
+        # 禁止调整大小
+        self.dialog.resizable(False, False)
+        
+        # 关闭窗口等同于不作选择
+        self.dialog.protocol("WM_DELETE_WINDOW", lambda: self._finish(None))
+        
+        # 创建内容
+        self._create_widgets()
+        self.dialog.withdraw()
+
+    def ask(self, title_text, allow_level_one, header_tree=None):
+        """
+        显示对话框并等待用户选择。
+
+        Returns:
+            选择的标题级别 (int)，"skip"，"cancel_all"，或关闭窗口时的 None。
+        """
+        self.result = None
+        self.dialog.title(f"修正标题: 【{title_text}】")
+        self.title_var.set(title_text)
+        valid_range = "1-6" if allow_level_one else "2-6"
+        self.instruction_var.set(f"请选择标题级别 ({valid_range})")
+        if allow_level_one:
+            self.level_buttons[1].pack(pady=4, before=self.level_buttons[2])
+        else:
+            self.level_buttons[1].pack_forget()
+        self._refresh_tree(header_tree or [])
         
         # 设置窗口大小
         window_width = 900
         window_height = 550
         
         # 计算窗口位置（居中在父窗口）
+        parent = self.parent
         parent.update_idletasks()
         parent_x = parent.winfo_x()
         parent_y = parent.winfo_y()
@@ -74,14 +132,42 @@ class HeaderLevelDialog:
         
         self.dialog.geometry(f"{window_width}x{window_height}+{x}+{y}")
         
-        # 禁止调整大小
-        self.dialog.resizable(False, False)
-        
-        # 创建内容
-        self._create_widgets()
-        
-        # 等待窗口关闭
-        self.dialog.wait_window()
+        # 显示窗口并等待用户选择
+        self.dialog.deiconify()
+        self.dialog.lift()
+        self.dialog.grab_set()
+        self.dialog.focus_set()
+        self._done_var.set(False)
+        self.dialog.wait_variable(self._done_var)
+        return self.result
+
+    def destroy(self):
+        """销毁对话框窗口。"""
+        self.dialog.destroy()
+
+    def _refresh_tree(self, header_tree):
+        """
+        更新左侧的标题树状图。
+        header_tree 只会追加，因此仅插入上次显示之后新增的标题。
+        """
+        shown = self._tree_len
+        if shown and len(header_tree) == shown:
+            return
+        tree_text = self.tree_text
+        tree_text.config(state=tk.NORMAL)
+        if not shown or len(header_tree) < shown:
+            # 首次填充（或树被替换）时清空，包括“暂无”提示
+            tree_text.delete('1.0', tk.END)
+            shown = 0
+        if header_tree:
+            # 合并为一次 insert，减少 Tcl 调用
+            tree_text.insert(tk.END, "".join(
+                f"{'  ' * (level - 1)}{'#' * level} {text}\n"
+                for level, text in header_tree[shown:]))
+        else:
+            tree_text.insert(tk.END, "（暂无已处理的标题）\n")
+        tree_text.config(state=tk.DISABLED)
+        self._tree_len = len(header_tree)
 
     def _create_widgets(self):
         """创建对话框内容"""
@@ -100,8 +186,8 @@ class HeaderLevelDialog:
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, 
                        padx=(0, 10), ipadx=10, ipady=10)
         
-        # 创建文本框显示树状图
-        tree_text = tk.Text(
+        # 创建文本框显示树状图（内容在 ask() 中填充）
+        tree_text = self.tree_text = tk.Text(
             left_frame, 
             width=45, 
             height=22, 
@@ -122,16 +208,6 @@ class HeaderLevelDialog:
         tree_scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         tree_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # 填充树状图
-        if self.header_tree:
-            for level, text in self.header_tree:
-                indent = "  " * (level - 1)
-                tree_text.insert(tk.END, f"{indent}{'#' * level} {text}\n")
-        else:
-            tree_text.insert(tk.END, "（暂无已处理的标题）\n")
-        
-        tree_text.config(state=tk.DISABLED)
-        
         # 右侧：选择区域
         right_frame = tk.Frame(main_frame, bg=self.colors['bg'])
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH)
@@ -148,7 +224,7 @@ class HeaderLevelDialog:
         
         title_label = tk.Label(
             current_frame,
-            text=self.title_text,
+            textvariable=self.title_var,
             font=('Arial', 12, 'bold'),
             wraplength=300,
             justify=tk.LEFT,
@@ -167,10 +243,9 @@ class HeaderLevelDialog:
         )
         select_frame.pack(fill=tk.BOTH, expand=True, ipadx=10, ipady=10)
         
-        valid_range = "1-6" if self.allow_level_one else "2-6"
         instruction_label = tk.Label(
             select_frame,
-            text=f"请选择标题级别 ({valid_range})",
+            textvariable=self.instruction_var,
             font=('Arial', 10),
             bg=self.colors['frame_bg'],
             fg=self.colors['fg']
@@ -181,8 +256,8 @@ class HeaderLevelDialog:
         button_frame = tk.Frame(select_frame, bg=self.colors['frame_bg'])
         button_frame.pack(pady=10)
 
-        start_level = 1 if self.allow_level_one else 2
-        for i in range(start_level, 7):
+        # 创建全部 6 个按钮，H1 按钮是否显示在 ask() 中决定
+        for i in range(1, 7):
             btn = tk.Button(
                 button_frame,
                 text=f"H{i} - {'#' * i}",
@@ -198,6 +273,7 @@ class HeaderLevelDialog:
                 command=lambda level=i: self._set_level_and_close(level)
             )
             btn.pack(pady=4)
+            self.level_buttons[i] = btn
         
         # 底部按钮
         bottom_frame = tk.Frame(select_frame, bg=self.colors['frame_bg'])
@@ -232,20 +308,24 @@ class HeaderLevelDialog:
         # 绑定ESC键
         self.dialog.bind("<Escape>", lambda e: self._skip())
 
+    def _finish(self, result):
+        """记录结果并隐藏窗口，结束本次 ask() 的等待"""
+        self.result = result
+        self.dialog.grab_release()
+        self.dialog.withdraw()
+        self._done_var.set(True)
+
     def _set_level_and_close(self, level):
         """设置级别并关闭"""
-        self.result = level
-        self.dialog.destroy()
+        self._finish(level)
 
     def _skip(self):
         """跳过当前项"""
-        self.result = "skip"
-        self.dialog.destroy()
+        self._finish("skip")
 
     def _cancel_process(self):
         """取消整个流程"""
-        self.result = "cancel_all"
-        self.dialog.destroy()
+        self._finish("cancel_all")
 
 
 class GuiBoldHeaderCorrector:
@@ -261,42 +341,47 @@ class GuiBoldHeaderCorrector:
         self.first_level_one_set = False
         self.user_cancelled = False
         self.header_tree = []  # 存储已处理的标题结构
+        self._dialog: Optional[HeaderLevelDialog] = None  # 复用的选择对话框
 
     def correct(self) -> None:
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            lines: List[str] = f.readlines()
-        new_lines: List[str] = []
+        content = read_text(self.input_path)
         
-        # 首先扫描文件，收集现有的标准标题
-        self._collect_existing_headers(lines)
+        # 首先扫描文件，收集现有的标准标题（逐行遍历，不构建行列表）
+        self._collect_existing_headers(io.StringIO(content))
         
-        for line in lines:
+        # 修正结果逐行写入临时文件，完成后再替换输出文件；
+        # 用户取消时不会留下写了一半的输出文件
+        temp_path = self.output_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for line in io.StringIO(content):
+                    result = self._get_corrected_line(line)
+                    if self.user_cancelled:
+                        break
+                    if result:
+                        corrected_line, level = result
+                        f.write(corrected_line)
+                        if level == 1 and not self.first_level_one_set:
+                            self._ask_to_disable_level_one()
+                            if self.user_cancelled:
+                                break
+                    else:
+                        f.write(line)
             if self.user_cancelled:
-                new_lines.append(line)
-                continue
-            result = self._get_corrected_line(line)
-            if result:
-                corrected_line, level = result
-                new_lines.append(corrected_line)
-                if level == 1 and not self.first_level_one_set:
-                    self._ask_to_disable_level_one()
-            else:
-                # 检查是否是已存在的标准标题，如果是则跳过
-                standard_header = re.match(r'^(#{1,6})\s+(.+)$', line)
-                if not standard_header:
-                    new_lines.append(line)
-                else:
-                    new_lines.append(line)
-        
-        if self.user_cancelled:
-            raise InterruptedError("用户取消了标题修正流程。")
-        with open(self.output_path, 'w', encoding='utf-8') as f:
-            f.writelines(new_lines)
-
-    def _collect_existing_headers(self, lines: List[str]) -> None:
+                raise InterruptedError("用户取消了标题修正流程。")
+            os.replace(temp_path, self.output_path)
+        finally:
+            # 所有候选标题处理完毕，销毁复用的对话框
+            if self._dialog is not None:
+                self._dialog.destroy()
+                self._dialog = None
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _collect_existing_headers(self, lines: Iterable[str]) -> None:
         """收集文件中已存在的标准标题"""
         for line in lines:
-            match = re.match(r'^(#{1,6})\s+(.+)$', line.strip())
+            match = _HEADER_PATTERN.match(line.strip())
             if match:
                 level = len(match.group(1))
                 text = match.group(2).strip()
@@ -304,20 +389,20 @@ class GuiBoldHeaderCorrector:
 
     def _get_corrected_line(self,
                             original_line: str) -> Optional[Tuple[str, int]]:
-        match = re.match(r'^\s*\*\*(.*?)\*\*\s*$', original_line)
-        if not match:
+        # 绝大多数行不含 '**'，先用子串查找快速排除
+        if '**' not in original_line:
             return None
-        header_text = match.group(1).strip()
+        header_text = _match_bold_header(original_line)
         if not header_text:
             return None
         self.parent_ui.log(f"找到潜在标题: 【{header_text}】")
-        dialog = HeaderLevelDialog(
-            self.parent_ui.root,
+        if self._dialog is None:
+            self._dialog = HeaderLevelDialog(self.parent_ui.root)
+        result = self._dialog.ask(
             header_text,
             self.allow_level_one,
             self.header_tree
         )
-        result = dialog.result
         if result == "skip":
             self.parent_ui.log("--> 已跳过，保留原样。")
             return None
@@ -352,20 +437,44 @@ class GuiBoldHeaderCorrector:
 class BoldHeaderCorrector:
     """一个用于在命令行中交互式修正“加粗标题”的类。"""
 
-    def __init__(self, input_path: str):
+    def __init__(self, input_path: str, auto: bool = False,
+                 answers_file: Optional[str] = None):
+        """
+        Args:
+            input_path: 要处理的 Markdown 文件路径。
+            auto: 非交互模式，为 True 时不询问用户，所有加粗标题保留原样。
+            answers_file: 应答文件路径。提供时按顺序读取其中的每一行作为回答，
+                          代替逐个提示用户输入。
+        """
         if not os.path.isfile(input_path):
             raise FileNotFoundError(f"错误：找不到文件 '{input_path}'。")
         self.input_path = input_path
+        self.auto = auto
         self.allow_level_one = True
         self.first_level_one_set = False
+        # 一次性读入全部回答，之后逐个取用
+        self._answers: Optional[Iterator[str]] = (
+            iter(read_text(answers_file).splitlines())
+            if answers_file is not None else None)
+
+    def _input(self, prompt: str) -> str:
+        """读取一个回答：有应答文件时取用其中的下一行，否则询问用户。"""
+        if self._answers is None:
+            return input(prompt)
+        answer = next(self._answers, None)
+        if answer is None:
+            # 与 input() 读到输入末尾时的行为一致
+            raise EOFError("应答文件中的回答已用完。")
+        print(f"{prompt}{answer}")
+        return answer
 
     def _get_corrected_line_cli(
             self, original_line: str) -> Optional[Tuple[str, int]]:
-        match = re.match(r'^\s*\*\*(.*?)\*\*\s*$', original_line)
-        if not match:
+        # 绝大多数行不含 '**'，先用子串查找快速排除
+        if '**' not in original_line:
             return None
-        header_text = match.group(1).strip()
-        if not header_text:
+        header_text = _match_bold_header(original_line)
+        if not header_text or self.auto:
             return None
         print("-" * 50)
         print(f"找到潜在标题: 【{header_text}】")
@@ -374,7 +483,7 @@ class BoldHeaderCorrector:
         while True:
             try:
                 prompt = f"请输入标题级别 ({prompt_range}), 或直接按 Enter 跳过: "
-                level_input = input(prompt)
+                level_input = self._input(prompt)
                 if not level_input:
                     print("--> 已跳过，保留原样。")
                     return None
@@ -391,7 +500,7 @@ class BoldHeaderCorrector:
         self.first_level_one_set = True
         while True:
             prompt = ("这是第一个一级标题。之后是否还需要设置一级标题? (y/n): ")
-            answer = input(prompt).lower()
+            answer = self._input(prompt).lower()
             if answer in ['y', 'yes']:
                 break
             if answer in ['n', 'no']:
@@ -401,23 +510,28 @@ class BoldHeaderCorrector:
             print("无效输入，请输入 'y' 或 'n'。")
 
     def correct(self) -> None:
-        with open(self.input_path, 'r', encoding='utf-8') as f:
-            lines: List[str] = f.readlines()
         print(f"开始处理文件: {self.input_path}\n")
-        new_lines: List[str] = []
-        for line in lines:
-            result = self._get_corrected_line_cli(line)
-            if result:
-                corrected_line, level = result
-                new_lines.append(corrected_line)
-                if level == 1 and not self.first_level_one_set:
-                    self._ask_to_disable_level_one_cli()
-            else:
-                new_lines.append(line)
         base, ext = os.path.splitext(self.input_path)
         output_path = f"{base}_corrected{ext}"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.writelines(new_lines)
+        # 边读边写，不在内存中保留整个文件；结果先写入临时文件，
+        # 完成后再替换输出文件，中途退出不会留下写了一半的输出文件
+        temp_path = output_path + '.tmp'
+        try:
+            with open(self.input_path, 'r', encoding='utf-8') as fin, \
+                    open(temp_path, 'w', encoding='utf-8') as fout:
+                for line in fin:
+                    result = self._get_corrected_line_cli(line)
+                    if result:
+                        corrected_line, level = result
+                        fout.write(corrected_line)
+                        if level == 1 and not self.first_level_one_set:
+                            self._ask_to_disable_level_one_cli()
+                    else:
+                        fout.write(line)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
         print("-" * 50)
         print("\n处理完成！")
         print(f"修正后的内容已保存到新文件: '{output_path}'")
@@ -425,14 +539,16 @@ class BoldHeaderCorrector:
 
 def main() -> None:
     """脚本作为独立程序运行的主入口点。"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) not in (2, 3):
         print("错误：请提供要处理的 Markdown 文件名。")
-        print(f"用法: python {sys.argv[0]} <文件名.md>")
+        print(f"用法: python {sys.argv[0]} <文件名.md> [可选的应答文件]")
         sys.exit(1)
     input_file = sys.argv[1]
+    answers_file = sys.argv[2] if len(sys.argv) > 2 else None
     try:
         # 当直接运行时，使用命令行版本的修正器
-        corrector = BoldHeaderCorrector(input_file)
+        corrector = BoldHeaderCorrector(input_file,
+                                        answers_file=answers_file)
         corrector.correct()
     except FileNotFoundError as e:
         print(e, file=sys.stderr)
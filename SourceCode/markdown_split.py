@@ -9,7 +9,7 @@ Markdown 文件拆分工具 (markdown_split.py)
 - 可根据 `#`, `##`, `###` 等标题进行分割。
 - 为每个标题及其内容创建一个新的 .md 文件。
 - 自动清理标题以生成安全、有效的文件名。
-- 在命令行模式下提供一个进度条。
+- 在命令行模式下显示处理进度。
 
 如何使用:
 
@@ -40,18 +40,158 @@ Markdown 文件拆分工具 (markdown_split.py)
         print(f"发生未知错误: {e}")
 """
 
+import functools
 import os
 import re
 import sys
-from typing import List
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (Deque, Dict, Iterator, List, Optional, Pattern, Set,
+                    TextIO, Tuple)
 
-# 尝试导入 tqdm 库，如果失败则提示用户安装
-try:
-    from tqdm import tqdm
-except ImportError:
-    print("错误：缺少 'tqdm' 库。")
-    print("请先通过命令 'pip install tqdm' 来安装它。")
-    sys.exit(1)
+# 预编译的正则表达式：用于清理文件名
+_LEADING_HASH_PATTERN = re.compile(r'^[#\s]+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+# 文件名中不允许出现的字符，使用 str.translate 一次删除
+_ILLEGAL_CHARS_TABLE = str.maketrans('', '', '\\/*?:"<>|')
+
+
+def _compile_header_pattern(split_by: str) -> Pattern[str]:
+    """
+    构建拆分标题的正则表达式：匹配换行符加整行标题
+    （换行符属于正文两侧的空白，不影响输出）。
+    标题文字不能为空，只有井号的行留在正文中，不会生成名为 `.md` 的文件。
+    """
+    return re.compile(rf'(?m)\n{re.escape(split_by)}[^\S\n]+\S.*$')
+
+
+# 一到六级标题的拆分模式在导入时预编译，split() 直接取用
+_HEADER_PATTERNS = {'#' * level: _compile_header_pattern('#' * level)
+                    for level in range(1, 7)}
+
+# 读写文件时使用的缓冲区大小，减少大文件的系统调用次数
+_IO_BUFFER_SIZE = 1 << 20
+# 直接通过文件描述符写入输出文件，跳过 TextIOWrapper/BufferedWriter
+_OPEN_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+               | getattr(os, 'O_BINARY', 0))
+# 支持 dir_fd 的平台上，输出目录只打开一次，之后按相对文件名创建文件
+_SUPPORTS_DIR_FD = os.open in os.supports_dir_fd
+# 支持 writev 的平台上，多个片段一次系统调用写出
+_HAS_WRITEV = hasattr(os, 'writev')
+# 后台写入章节文件的线程数，以及最多允许排队等待写入的章节数
+_WRITE_WORKERS = 4
+_MAX_PENDING_WRITES = 64
+
+
+def _print_progress(count: int) -> None:
+    """在同一行刷新已生成的文件数。"""
+    sys.stderr.write(f"\r正在拆分文件: {count} 个文件")
+    sys.stderr.flush()
+
+
+class _SectionWriter:
+    """
+    将一个章节的正文逐行写入文件，写出的内容与 `正文.strip()` 相同：
+    开头的空白行直接丢弃，末尾的空白先暂存，只有其后再出现正文时才写出。
+    未指定标题时（前言部分），只有出现正文后才会创建文件。
+
+    写入的文本先在内存中累积（不超过 _IO_BUFFER_SIZE），
+    再编码后一次性 os.write，换行符与文本模式写入一样转换为 os.linesep。
+    文件在第一次写出时才打开，因此较小的章节可以整个交给 close() 完成
+    打开、写入和关闭，close() 可以在后台线程中执行。
+    """
+
+    def __init__(self, filepath: str, header: Optional[str] = None,
+                 dir_fd: Optional[int] = None):
+        """
+        Args:
+            filepath: 输出文件路径；指定 dir_fd 时为相对于该目录的文件名。
+            header: 章节标题，为 None 时表示前言部分。
+            dir_fd: 已打开的输出目录的文件描述符。
+        """
+        self.filepath = filepath
+        self.dir_fd = dir_fd
+        self._fd: Optional[int] = None
+        self._created = header is not None
+        self._closed = False
+        self._chunks: List[str] = []
+        self._buffered = 0
+        self._started = False  # 是否已写出正文
+        self._pending = ''  # 暂存的空白，后面出现正文时再写出
+        if header is not None:
+            self._write(f"{header}\n\n")
+
+    @property
+    def created(self) -> bool:
+        """是否会创建输出文件。"""
+        return self._created
+
+    def _write(self, text: str) -> None:
+        self._chunks.append(text)
+        self._buffered += len(text)
+        if self._buffered >= _IO_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._fd is None:
+            self._fd = os.open(self.filepath, _OPEN_FLAGS, 0o666,
+                               dir_fd=self.dir_fd)
+        if not self._chunks:
+            return
+        if os.linesep != '\n':
+            parts = [chunk.replace('\n', os.linesep).encode('utf-8')
+                     for chunk in self._chunks]
+        else:
+            parts = [chunk.encode('utf-8') for chunk in self._chunks]
+        self._chunks.clear()
+        self._buffered = 0
+        # 各片段分别编码后直接聚集写出，不再先拼接成一个完整的字符串
+        if _HAS_WRITEV:
+            written = os.writev(self._fd, parts)
+            total = sum(map(len, parts))
+            if written == total:
+                return
+            data = memoryview(b''.join(parts))[written:]
+        else:
+            data = memoryview(b''.join(parts))
+        # os.write 可能只写入一部分，循环直到全部写出
+        while data:
+            data = data[os.write(self._fd, data):]
+
+    def write(self, text: str, start: int, end: int) -> None:
+        """
+        写入正文片段 text[start:end]。
+        首尾空白通过移动下标跳过，片段只切片一次，不再额外调用 strip()。
+        """
+        stop = end
+        while stop > start and text[stop - 1].isspace():
+            stop -= 1
+        if stop == start:
+            if self._started:
+                self._pending += text[start:end]
+            return
+        if self._started:
+            self._write(self._pending)
+        else:
+            self._started = True
+            self._created = True
+            while text[start].isspace():
+                start += 1
+        self._write(text[start:stop])
+        self._pending = text[stop:end]
+
+    def close(self) -> None:
+        """写出缓冲内容并关闭文件，末尾暂存的空白被丢弃。"""
+        if not self._created or self._closed:
+            return
+        self._closed = True
+        try:
+            self._flush()
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
 
 
 class MarkdownSplitter:
@@ -75,82 +215,162 @@ class MarkdownSplitter:
             raise FileNotFoundError(error_msg)
         self.input_file = input_file
         self.output_dir = output_dir
-        self.content: str = ""
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _sanitize_filename(name: str) -> str:
         """
         清理字符串，使其成为一个有效的文件名。
-        这是一个静态方法，因为它不依赖于任何实例状态。
+        这是一个静态方法，因为它不依赖于任何实例状态；
+        结果只取决于参数，因此缓存起来供重复出现的标题直接复用。
         """
         # 移除标题前的 # 号和空格
-        name = re.sub(r'^[#\s]+', '', name.strip())
+        name = _LEADING_HASH_PATTERN.sub('', name.strip())
         # 移除 Windows 和 aLinux 不支持的文件名字符
-        name = re.sub(r'[\\/*?:"<>|]', "", name)
+        name = name.translate(_ILLEGAL_CHARS_TABLE)
         # 将连续的空格替换为下划线
-        name = re.sub(r'\s+', '_', name)
+        name = _WHITESPACE_PATTERN.sub('_', name)
         # 限制文件名长度
         return name[:100]
 
-    def _read_content(self) -> bool:
-        """从输入文件读取内容，如果成功则返回 True。"""
-        try:
-            with open(self.input_file, 'r', encoding='utf-8') as f:
-                self.content = f.read()
-            return True
-        except Exception as e:
-            print(f"读取文件时发生错误：{e}")
-            return False
+    @staticmethod
+    def _iter_segments(stream: TextIO, header_pattern: Pattern[str]
+                       ) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+        """
+        按块读取输入，产出 (缓冲区, 起点, 终点, 标题)。
+        缓冲区[起点:终点] 是一段正文，标题是紧随其后的拆分标题，
+        块内最后一段正文之后没有标题，此时为 None。
+
+        标题模式以 '\n' 开头，正则引擎可以按字面前缀快速跳过无关文本，
+        而不必在每个位置检查 '^'。因此每块只处理到最后一个换行符之前，
+        从该换行符开始的剩余部分并入下一块，使每块都以 '\n' 开头；
+        第一块前补一个 '\n'，它只是前言开头的空白，不影响输出。
+        """
+        carry = '\n'
+        while True:
+            chunk = stream.read(_IO_BUFFER_SIZE)
+            buffer = carry + chunk
+            # 读到文件末尾时，最后一行即使没有换行符也一并处理
+            limit = max(buffer.rfind('\n'), 0) if chunk else len(buffer)
+            pos = 0
+            for match in header_pattern.finditer(buffer, 0, limit):
+                yield buffer, pos, match.start(), match.group().strip()
+                pos = match.end()
+            yield buffer, pos, limit, None
+            if not chunk:
+                return
+            carry = buffer[limit:]
 
     def split(self, split_by: str = "##", show_progress: bool = True) -> None:
         """
         执行拆分操作。
 
+        输入文件按块流式读取，在每块中查找标题的位置：正文片段按下标直接写入
+        当前文件，遇到标题时关闭当前文件并创建新文件，内存占用与文件大小无关。
+
         Args:
             split_by: 用于拆分的标题级别, 例如 "##" 或 "###"。
-            show_progress: 是否在控制台显示进度条。对于外部调用，建议设为 False。
+            show_progress: 是否在控制台显示进度。对于外部调用，建议设为 False。
         """
-        if not self._read_content():
+        try:
+            input_file = open(self.input_file, 'r', encoding='utf-8')
+        except OSError as e:
+            print(f"读取文件时发生错误：{e}")
             print("文件内容为空或读取失败，已中止操作。")
             return
 
         os.makedirs(self.output_dir, exist_ok=True)
 
-        # 根据传入的 split_by 参数构建动态的正则表达式
-        split_pattern = re.escape(split_by)
-        regex = rf'(\n{split_pattern}\s.*)\n'
-        sections: List[str] = re.split(regex, self.content)
-
-        # 处理第一个标题之前的内容 (前言部分)
-        prologue: str = sections[0].strip()
-        if prologue:
-            filename = "00_前言.md"
-            filepath = os.path.join(self.output_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(prologue)
-            if show_progress:
-                print(f"已创建前言文件: {filepath}")
-
-        # 设置循环迭代器，根据参数决定是否使用 tqdm 包装
-        section_pairs = range(1, len(sections), 2)
-        iterator = (tqdm(section_pairs, desc="正在拆分文件", unit="个文件")
-                    if show_progress else section_pairs)
-
-        if show_progress and len(sections) > 1:
-            print(f"\n开始处理 {split_by} 级标题并生成文件...")
-
-        for i in iterator:
-            header: str = sections[i].strip()
-            body: str = ""
-            if (i + 1) < len(sections):
-                body = sections[i + 1].strip()
-
-            filename = self._sanitize_filename(header) + ".md"
-            filepath = os.path.join(self.output_dir, filename)
-
-            full_content = f"{header}\n\n{body}"
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(full_content)
+        # 常用的标题级别使用预编译的模式，其他取值才动态构建
+        header_pattern = (_HEADER_PATTERNS.get(split_by)
+                          or _compile_header_pattern(split_by))
+
+        found_header = False
+        section_count = 0
+        # 重名的标题依次加上 _1, _2 ... 后缀，避免后面的章节覆盖前面的文件。
+        # name_counts 记录每个基础名下一个可用的序号，used_names 记录已占用
+        # 的文件名，保证生成的名字不会与真实标题（如 "A_1"）的文件名冲突。
+        # 按小写比较，使不区分大小写的文件系统上也不会有两个章节同时写入
+        # 同一个文件；前言的文件名预先占用
+        name_counts: Dict[str, int] = {}
+        used_names: Set[str] = {"00_前言.md"}
+        # 已交给线程池、尚未确认完成的章节；信号量限制其数量，使内存占用有界
+        futures: Deque[Future] = deque()
+        slots = threading.BoundedSemaphore(_MAX_PENDING_WRITES)
+
+        def close_in_background(section: _SectionWriter) -> None:
+            """在线程池中完成章节文件的打开、写入和关闭，与后续解析重叠进行。"""
+            slots.acquire()
+            future = executor.submit(section.close)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+            # 及时取出已完成的任务，写入出错时尽早抛出
+            while futures and futures[0].done():
+                futures.popleft().result()
+
+        with input_file, ThreadPoolExecutor(_WRITE_WORKERS) as executor:
+            # 输出目录只解析一次，之后的文件都相对于它创建，
+            # 省去每个文件的完整路径查找
+            dir_fd = (os.open(self.output_dir,
+                              os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+                      if _SUPPORTS_DIR_FD else None)
+            # 第一个标题之前的内容 (前言部分)，只有存在正文时才创建文件
+            prologue_path = os.path.join(self.output_dir, "00_前言.md")
+            writer: Optional[_SectionWriter] = _SectionWriter(
+                "00_前言.md" if dir_fd is not None else prologue_path,
+                dir_fd=dir_fd)
+            try:
+                for buffer, start, end, header in self._iter_segments(
+                        input_file, header_pattern):
+                    writer.write(buffer, start, end)
+                    if header is None:
+                        continue
+
+                    # 交给线程池后该章节归后台线程所有，先解除引用，
+                    # 避免出错时 finally 中再次关闭同一个文件
+                    finished, writer = writer, None
+                    close_in_background(finished)
+                    if not found_header:
+                        found_header = True
+                        if show_progress:
+                            if finished.created:
+                                print(f"已创建前言文件: {prologue_path}")
+                            print(f"\n开始处理 {split_by} 级标题并生成文件...")
+                    section_count += 1
+                    # 每 64 个文件刷新一次进度，避免逐个文件输出的开销
+                    if show_progress and not section_count & 63:
+                        _print_progress(section_count)
+
+                    base = self._sanitize_filename(header)
+                    key = base.lower()
+                    count = name_counts.get(key, 0)
+                    filename = f"{base}_{count}.md" if count else f"{base}.md"
+                    while filename.lower() in used_names:
+                        count += 1
+                        filename = f"{base}_{count}.md"
+                    name_counts[key] = count + 1
+                    used_names.add(filename.lower())
+                    if dir_fd is None:
+                        filename = os.path.join(self.output_dir, filename)
+                    writer = _SectionWriter(filename, header, dir_fd)
+
+                writer.close()
+                for future in futures:
+                    future.result()
+            finally:
+                if writer is not None:
+                    writer.close()
+                # 等待所有后台写入结束后才能关闭目录描述符
+                executor.shutdown()
+                if dir_fd is not None:
+                    os.close(dir_fd)
+
+        if not found_header:
+            if show_progress and writer.created:
+                print(f"已创建前言文件: {prologue_path}")
+        elif show_progress:
+            _print_progress(section_count)
+            sys.stderr.write('\n')
 
         if show_progress:
             print(f"\n处理完成！所有文件已保存在 '{self.output_dir}' 文件夹中。")